@@ -2,6 +2,12 @@
 
 from joueur.base_ai import BaseAI
 from games.saloon.tile import Tile
+from games.saloon.bottle import Bottle
+from games.saloon.cowboy import Cowboy
+from games.saloon.furnishing import Furnishing
+from games.saloon.player import Player
+from games.saloon.young_gun import YoungGun
+from joueur.snapshots import Snapshots
 import random
 import time
 
@@ -15,6 +21,9 @@ from games.saloon.strategy import best_drunk_direction, best_bang_direction,\
         move_to, move_starting_cowboys
 from games.saloon.asciivis import draw_everything, general_tile_func
 from games.saloon.train import train_strat
+from games.saloon.budget import TurnBudget, FULL, TRAIN
+from games.saloon.ponder import Ponder, live_bottles, bottles_key, walls_key
+from games.saloon.util import threatened_tiles
 
 
 class AI(BaseAI):
@@ -24,15 +33,77 @@ class AI(BaseAI):
         return "Console Cowboy" # REPLACE THIS WITH YOUR TEAM NAME
 
     def start(self):
-        pass
+        self.budget = TurnBudget()
+        self.ponder = Ponder(self)
+        self.pondered = None
+        self._installed_danger = None  # the tiles install_danger last marked as in danger
+        self.piano_slots = {}  # tile: the piano it is next to, kept by set_tile_piano
+        # self.snapshots.of_turn(t) is the board as it was at the end of turn t
+        self.snapshots = Snapshots(self.game, (Cowboy, Bottle, Furnishing, Player, Tile, YoungGun))
 
     def game_updated(self):
         """ This is called every time the game's state updates, so if you are tracking anything you can update it here.
         """
         # replace with your game updated logic
+        changes = self.changes  # None when everything should be treated as changed
+        if changes is not None:  # start() already snapshot everything
+            self.snapshots.record(changes)
+        self.ponder.updated()
+        self.update_board(changes)
+        if self.pondered:  # Our turn, so keep what was pondered for it true to the state
+            if changes is None or changes.changed(Bottle, 'tile', 'direction', 'is_destroyed'):
+                bottles = live_bottles(self.game)
+                if bottles_key(bottles) != self.pondered.bottles:
+                    self.pondered.bottles = bottles_key(bottles)
+                    self.pondered.danger = threatened_tiles(bottles)
+                    self.install_danger()
+            if self.pondered.walls is not None and (changes is None or changes.changed(Furnishing, 'tile', 'is_destroyed', 'is_piano')):
+                if self.pondered.walls != walls_key(self.game):
+                    self.pondered.walls = None
+                    self.pondered.fields = {}
+
+    def update_board(self, changes):
+        """ Keeps pianos (with their owners and slots) and hazards up to date, only redoing what changes touched. Tiles by (x, y) are self.game.grid.at(x, y) """
+        if changes is None or not hasattr(self, 'hazards'):
+            self.hazards = {t for t in self.game.tiles if t._has_hazard}
+            self.pianos = None
+        if changes is not None:
+            for tile, _, _, has_hazard in changes.of('has_hazard'):
+                if has_hazard:
+                    self.hazards.add(tile)
+                else:
+                    self.hazards.discard(tile)
+        if self.pianos is None or changes.changed(Furnishing, 'tile', 'is_destroyed', 'is_piano'):
+            self.pianos = [f for f in self.game.furnishings if f._is_piano and not f._is_destroyed and f._tile]
+            classify_pianos(self)
+            set_tile_piano(self)
+
+    def install_danger(self):
+        """ Sets tile.danger from what was pondered, only touching the tiles it changed for """
+        danger = self.pondered.danger
+        if self._installed_danger is None:
+            for tile in self.game.tiles:
+                tile.danger = tile in danger
+        else:
+            for tile in self._installed_danger.symmetric_difference(danger):
+                tile.danger = tile in danger
+        self._installed_danger = set(danger)
+
+    def clear_danger(self):
+        """ Our turn is over, so tile.danger no longer holds: back to None, for util.safe to work out again """
+        if self._installed_danger is not None:
+            for tile in self.game.tiles:
+                tile.danger = None
+            self._installed_danger = None
+
+    def install_pondered(self):
+        """ Puts what was pondered for this turn where the strategies look for it """
+        self.pondered = self.ponder.take()
+        self.install_danger()
 
     def end(self, won, reason):
-        pass
+        print(self.budget.summary())
+        print('Ponder: reused {} pieces, found {} again'.format(self.ponder.reused, self.ponder.discarded))
 
     i = 0
     def run_turn(self):
@@ -64,23 +135,31 @@ class AI(BaseAI):
             return True
 
         if True:
-            if self.player.score > self.player.opponent.score + 40:
+            self.install_pondered()
+            # Comfortably ahead, so just keep the train going
+            preferred = TRAIN if self.player.score > self.player.opponent.score + 40 else FULL
+            tier = self.budget.start_turn(self.player, self.game, preferred)
+            if tier == FULL:
+                move_starting_cowboys(self, self.budget.phase('move', 0.8))
+                play_pianos(self, self.budget.phase('play', 0.5))
+                if self.budget.left() > 0:  # Only for watching, skip it when short on time
+                    self.budget.phase('draw', 1)
+                    draw_everything(self, general_tile_func)
+            elif tier == TRAIN:
+                deadline = self.budget.phase('train', 1)
                 try:
-                    train_strat(self)
+                    train_strat(self, deadline)
                 except Exception:
                     pass
             else:
-                move_starting_cowboys(self)
-                play_pianos(self)
-                draw_everything(self, general_tile_func)
+                play_pianos(self, self.budget.phase('greedy', 1))
+            self.budget.end_turn(self.player, self.game)
+            self.pondered = None
+            self.clear_danger()
+            self.ponder.turn_over()
             return True
 
-        # Init stuff
-        self.tiles_pos = {(tile.x, tile.y): tile for tile in self.game.tiles}
-        self.pianos = [f for f in self.game.furnishings if f._is_piano and not f._is_destroyed]
-        self.hazards = [t for t in self.game.tiles if t._has_hazard]
-        classify_pianos(self)
-        set_tile_piano(self)
+        # Init stuff, pianos and hazards are kept up to date by game_updated
         for c in self.player.cowboys:
             c.moving = False
             c.target = None
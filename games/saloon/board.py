@@ -0,0 +1,128 @@
+try:
+    import numpy
+except ImportError:  # NumPy is optional, without it the Game has no layers
+    numpy = None
+
+from games.saloon.tile import NORTH, EAST, SOUTH, WEST, direction_index
+
+# the fields whose changes can change a tile's cells, on the tile itself, and on what is on it
+_TILE_FIELDS = ('cowboy', 'furnishing', 'bottle', 'has_hazard', 'is_balcony')
+_OCCUPANT_FIELDS = ('owner', 'job', 'is_piano', 'direction')
+
+# (dy, dx) of each direction's index
+_STEPS = {NORTH: (-1, 0), EAST: (0, 1), SOUTH: (1, 0), WEST: (0, -1)}
+
+
+def _shifted(layer, dy, dx):
+    """ layer moved dy rows and dx columns, so each cell holds what was dy, dx before it, zeros past the edges """
+    moved = numpy.zeros_like(layer)
+    height, width = layer.shape
+    moved[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)] =\
+        layer[max(-dy, 0):height + min(-dy, 0), max(-dx, 0):width + min(-dx, 0)]
+    return moved
+
+
+class Layers(object):
+    """
+    The board as NumPy arrays of map_height x map_width, one per thing the
+    strategies ask of tiles, so questions about the whole board can be
+    vectorized:
+      furnishing, piano, hazard, balcony, bottle: bool
+      bottle_direction: the NORTH, EAST, SOUTH or WEST index of the bottle there, -1 for none
+      cowboy_owner: the index in game.players of the owner of the cowboy there, -1 for none
+      cowboy_job: the index in game.jobs of the job of the cowboy there, -1 for none
+
+    Each cell is exactly what its tile says (e.g. a tile's furnishing counts
+    even when destroyed, as it does for tile.furnishing). The Game builds
+    them with its grid, then updates just the tiles each delta touched. A
+    layer's flat ravel() is indexed by tile id on the grid.
+    """
+
+    available = numpy is not None
+
+    def __init__(self, game):
+        self.game = game
+        shape = (game._map_height, game._map_width)
+        self.furnishing = numpy.zeros(shape, bool)
+        self.piano = numpy.zeros(shape, bool)
+        self.hazard = numpy.zeros(shape, bool)
+        self.balcony = numpy.zeros(shape, bool)
+        self.bottle = numpy.zeros(shape, bool)
+        self.bottle_direction = numpy.full(shape, -1, numpy.int8)
+        self.cowboy_owner = numpy.full(shape, -1, numpy.int8)
+        self.cowboy_job = numpy.full(shape, -1, numpy.int8)
+        self.update(game.grid.tiles)
+
+    def update(self, tiles):
+        """ sets the cells of the tiles from what is on them now """
+        players = self.game._players
+        jobs = self.game._jobs
+        furnishing, piano, hazard, balcony, bottle = (layer.ravel() for layer in (self.furnishing, self.piano, self.hazard, self.balcony, self.bottle))
+        bottle_direction, cowboy_owner, cowboy_job = (layer.ravel() for layer in (self.bottle_direction, self.cowboy_owner, self.cowboy_job))
+        for tile in tiles:
+            if tile is None or tile._grid_id < 0:
+                continue
+            id = tile._grid_id
+            f = tile._furnishing
+            furnishing[id] = f is not None
+            piano[id] = f is not None and f._is_piano
+            hazard[id] = tile._has_hazard
+            balcony[id] = tile._is_balcony
+            b = tile._bottle
+            bottle[id] = b is not None
+            bottle_direction[id] = direction_index(b._direction) if b is not None and b._direction else -1
+            c = tile._cowboy
+            cowboy_owner[id] = players.index(c._owner) if c is not None and c._owner in players else -1
+            cowboy_job[id] = jobs.index(c._job) if c is not None and c._job in jobs else -1
+
+    def apply(self, journal):
+        """ updates the cells of every tile the ChangeJournal of a delta touched """
+        tiles = set()
+        for field in _TILE_FIELDS:
+            for obj, _, _, _ in journal.of(field):
+                tiles.add(obj)
+        for _, _, old, new in journal.of('tile'):
+            tiles.add(old)
+            tiles.add(new)
+        for field in _OCCUPANT_FIELDS:
+            for obj, _, _, _ in journal.of(field):
+                tiles.add(getattr(obj, '_tile', None))
+        for obj in journal.created:
+            tiles.add(getattr(obj, '_tile', None))
+        tiles.discard(None)
+        self.update(tiles)
+
+    def cowboys(self, player=None, job=None):
+        """ bool layer of the tiles with a cowboy on them, of the player and job (e.g. "Brawler") if given """
+        found = self.cowboy_owner >= 0
+        if player is not None:
+            found &= self.cowboy_owner == self.game._players.index(player)
+        if job is not None:
+            found &= self.cowboy_job == self.game._jobs.index(job)
+        return found
+
+    def enemies(self, player):
+        """ bool layer of the tiles with a cowboy of anyone but the player on them """
+        return (self.cowboy_owner >= 0) & (self.cowboy_owner != self.game._players.index(player))
+
+    def walls(self):
+        """ bool layer of where util.wall_func is true: furnishings, balconies and cowboys """
+        return self.furnishing | self.balcony | (self.cowboy_owner >= 0)
+
+    def around(self, layer):
+        """ int layer of how many of each tile's neighbors are true in the layer """
+        layer = layer.astype(numpy.int8)
+        return _shifted(layer, 1, 0) + _shifted(layer, -1, 0) + _shifted(layer, 0, 1) + _shifted(layer, 0, -1)
+
+    def threatened(self):
+        """ bool layer of the tiles bottles will move into within their next two moves, as util.threatened_tiles """
+        threatened = numpy.zeros(self.bottle.shape, bool)
+        for direction, (dy, dx) in _STEPS.items():
+            flying = self.bottle & (self.bottle_direction == direction)
+            threatened |= _shifted(flying, dy, dx) | _shifted(flying, 2 * dy, 2 * dx)
+        return threatened
+
+    def near_enemy_pianos(self, player, threshold=2):
+        """ bool layer of where util.is_near_enemy_piano is true: empty tiles next to a piano with threshold or more enemy cowboys around it """
+        contested = self.piano & (self.around(self.enemies(player)) >= threshold)
+        return (self.around(contested) > 0) & (self.cowboy_owner < 0)
@@ -14,6 +14,8 @@ class Bottle(GameObject):
     A bottle thrown by a bartender at a Tile.
     """
 
+    __slots__ = ('_direction', '_drunk_direction', '_is_destroyed', '_tile')
+
     def __init__(self):
         """Initializes a Bottle with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -0,0 +1,108 @@
+import time
+from collections import namedtuple
+
+# the strategies run_turn can pick from, most expensive first
+FULL = 'full'  # move_starting_cowboys, play_pianos and draw_everything
+TRAIN = 'train'  # train_strat
+GREEDY = 'greedy'  # just play whatever pianos are already next to us
+TIERS = (FULL, TRAIN, GREEDY)
+# seconds each tier is guessed to cost until a turn has measured it, on the expensive side of what they take on a 44x24 map
+SEED_COSTS = {FULL: 0.04, TRAIN: 0.005, GREEDY: 0.001}
+
+TurnRecord = namedtuple('TurnRecord', 'turn tier allowance elapsed missed'.split())
+
+
+def expired(deadline):
+    """ If the deadline (a time.perf_counter() from TurnBudget.phase) has passed, never for None """
+    return deadline is not None and time.perf_counter() > deadline
+
+
+class TurnBudget(object):
+    """
+    Splits the time the server says we have left (Player.time_remaining, in ns)
+    over the turns still to play, and picks the most expensive tier that
+    should fit in this turn's share.
+
+    Each tier's cost starts from its SEED_COSTS guess, is replaced by the
+    first turn it was picked for, and is learned from those after it. Any
+    time the server gives back between our turns is learned too, so the
+    allowance covers it.
+    """
+
+    def __init__(self, reserve=0.2, smoothing=0.3):
+        self.reserve = reserve  # fraction of the time left never planned to be spent
+        self.smoothing = smoothing
+        self.costs = dict(SEED_COSTS)  # seconds
+        self._measured = set()  # the tiers a turn has been timed for
+        self.increment = 0.0  # seconds the server adds to our clock between our turns
+        self.turns = []  # a TurnRecord for every turn played
+        self.tier = None
+        self.allowance = None
+        self._started = None
+        self._deadline = None
+        self._phase = None
+        self._missed = []
+        self._expected_remaining = None
+
+    def _smooth(self, old, new):
+        return old + self.smoothing * (new - old)
+
+    def predict(self, time_remaining, current_turn, max_turns):
+        """ Seconds this turn can use, from our clock (ns) and the turns we have left """
+        our_turns_left = max(1, (max_turns - current_turn + 1) // 2)  # players alternate turns
+        seconds = time_remaining / 1e9 + self.increment * (our_turns_left - 1)
+        return max(0.0, seconds * (1 - self.reserve) / our_turns_left)
+
+    def start_turn(self, player, game, preferred=FULL):
+        """ Starts timing a turn, returning the tier it can afford, no more expensive than preferred """
+        self._started = time.perf_counter()
+        if self._expected_remaining is not None:
+            given_back = player.time_remaining / 1e9 - self._expected_remaining
+            self.increment = max(0.0, self._smooth(self.increment, given_back))
+
+        self.allowance = self.predict(player.time_remaining, game.current_turn, game.max_turns)
+        self._deadline = self._started + self.allowance
+        self._missed = []
+        self._phase = None
+
+        self.tier = GREEDY
+        for tier in TIERS[TIERS.index(preferred):]:
+            if self.costs[tier] <= self.allowance:
+                self.tier = tier
+                break
+        return self.tier
+
+    def phase(self, name, share):
+        """ Starts a phase that may use `share` of what is left of the turn, returning its deadline for the strategy to check with expired() """
+        self.end_phase()
+        now = time.perf_counter()
+        self._phase = name, now + max(0.0, self._deadline - now) * share
+        return self._phase[1]
+
+    def end_phase(self):
+        if self._phase:
+            name, deadline = self._phase
+            if time.perf_counter() > deadline:
+                self._missed.append(name)
+            self._phase = None
+
+    def left(self):
+        """ Seconds left of this turn's allowance """
+        return self._deadline - time.perf_counter()
+
+    def end_turn(self, player, game):
+        self.end_phase()
+        elapsed = time.perf_counter() - self._started
+        self.costs[self.tier] = self._smooth(self.costs[self.tier], elapsed) if self.tier in self._measured else elapsed
+        self._measured.add(self.tier)
+        self._expected_remaining = player.time_remaining / 1e9 - elapsed
+        if elapsed > self.allowance:
+            self._missed.append('turn')
+        self.turns.append(TurnRecord(game.current_turn, self.tier, self.allowance, elapsed, tuple(self._missed)))
+        return self.turns[-1]
+
+    def summary(self):
+        tiers = {tier: sum(1 for t in self.turns if t.tier == tier) for tier in TIERS}
+        missed = sum(1 for t in self.turns if t.missed)
+        return 'Budget: {} turns ({}), {} missed a deadline'.format(
+                len(self.turns), ', '.join('{} {}'.format(n, tier) for tier, n in tiers.items() if n), missed)
@@ -14,6 +14,10 @@ class Cowboy(GameObject):
     A person on the map that can move around and interact within the saloon.
     """
 
+    __slots__ = ('_can_move', '_drunk_direction', '_focus', '_health', '_is_dead', '_is_drunk', '_job', '_owner', '_tile', '_tolerance', '_turns_busy',
+        # the AI's own fields on it
+        'assignment', 'moving', 'path', 'path_index', 'preferred', 'prev_assignment', 'prev_tile', 'same_tile', 'target')
+
     def __init__(self):
         """Initializes a Cowboy with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -0,0 +1,84 @@
+from bisect import bisect_left, insort
+
+from games.saloon.player import Player
+
+
+def _bucket_keys(player, job, alive, can_move):
+    """ the keys of every bucket a cowboy with the job, alive and can_move is in: its own, and each with some of them None (any) """
+    return [(player, j, a, m) for j in (job, None) for a in (alive, None) for m in (can_move, None)]
+
+
+class CowboyIndex(object):
+    """
+    Every player's cowboys, bucketed by (player, job, alive, can_move), so
+    the strategies can ask for e.g. a player's live Brawlers, or count them,
+    without filtering player.cowboys.
+
+    A cowboy is in the bucket of its own key and in those of the same key
+    with any of job, alive and can_move replaced by None, so every query is
+    one bucket. A bucket is the sorted indexes of its cowboys in
+    player.cowboys, so counts are its length and queries are in order.
+
+    The Game keeps it up to date from the ChangeJournal of every delta: a
+    player is synced when its cowboys list changes, and a cowboy is moved
+    between buckets when its job, is_dead or can_move does. Membership is
+    by player.cowboys, not cowboy.owner, so just called in cowboys aren't
+    in it until they are in their player's list.
+    """
+
+    def __init__(self):
+        self._buckets = {}  # (player, job, alive, can_move), each of the last three None for any: sorted indexes in player.cowboys
+        self._placed = {}  # cowboy: (the key of its own bucket, its index in player.cowboys)
+
+    def _place(self, cowboy, player, index):
+        key = (player, cowboy._job, not cowboy._is_dead, cowboy._can_move)
+        placed = self._placed.get(cowboy)
+        if placed == (key, index):
+            return
+        if placed is not None:
+            self._remove(cowboy)
+        buckets = self._buckets
+        for bucket_key in _bucket_keys(*key):
+            bucket = buckets.get(bucket_key)
+            if bucket is None:
+                bucket = buckets[bucket_key] = []
+            insort(bucket, index)
+        self._placed[cowboy] = (key, index)
+
+    def _remove(self, cowboy):
+        key, index = self._placed.pop(cowboy)
+        for bucket_key in _bucket_keys(*key):
+            bucket = self._buckets[bucket_key]
+            del bucket[bisect_left(bucket, index)]
+
+    def sync(self, player):
+        """ indexes the player's cowboys from its cowboys list """
+        player._cowboy_index = self
+        listed = set()
+        for index, cowboy in enumerate(player._cowboys):
+            if cowboy is not None:
+                listed.add(cowboy)
+                self._place(cowboy, player, index)
+        for cowboy, (key, _) in list(self._placed.items()):
+            if key[0] is player and cowboy not in listed:
+                self._remove(cowboy)
+
+    def apply(self, journal):
+        """ updates the index from the ChangeJournal of a delta """
+        for player in journal.changed(Player, 'cowboys'):
+            self.sync(player)
+        placed = self._placed
+        for field in ('job', 'is_dead', 'can_move'):
+            for cowboy, _, _, _ in journal.of(field):
+                if cowboy in placed:
+                    key, index = placed[cowboy]
+                    self._place(cowboy, key[0], index)
+
+    def count(self, player, job=None, alive=None, can_move=None):
+        """ how many of the player's cowboys have the job, and are alive and can move, each if given """
+        return len(self._buckets.get((player, job, alive, can_move), ()))
+
+    def cowboys(self, player, job=None, alive=None, can_move=None):
+        """ the player's cowboys with the job, and alive and able to move, each if given, in player.cowboys order """
+        cowboys = player._cowboys
+        return [cowboys[index] for index in self._buckets.get((player, job, alive, can_move), ())]
@@ -0,0 +1,121 @@
+from array import array
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, without it the columns are arrays from the array module
+    numpy = None
+
+from games.saloon.cowboy import Cowboy
+
+# the columns, and what changes to them come in as: the Cowboy field, or the tile for x and y
+COLUMNS = ('health', 'turns_busy', 'focus', 'tolerance', 'x', 'y', 'is_drunk', 'is_dead', 'can_move', 'owner', 'job')
+_FIELDS = ('health', 'turns_busy', 'focus', 'tolerance', 'is_drunk', 'is_dead', 'can_move', 'owner', 'job', 'tile')
+
+
+class CowboyStore(object):
+    """
+    Every cowboy's numbers as columns, one row (slot) per cowboy in the order
+    they were created, so scoring can run over all of them at once instead
+    of reading each cowboy's properties. The columns are NumPy int32 arrays,
+    or array('i')s from the array module without NumPy:
+      health, turns_busy, focus, tolerance
+      x, y: of the cowboy's tile, -1 when it has none
+      is_drunk, is_dead, can_move: 1 or 0
+      owner: the index in game.players of the cowboy's owner, -1 for none
+      job: the index in game.jobs of the cowboy's job, -1 for none
+
+    The Game adds the cowboys each delta creates and sets the cells of the
+    fields it changed, from its ChangeJournal.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.cowboys = []  # slot: Cowboy
+        self.slots = {}  # Cowboy: slot
+        self._columns = {name: self._new_column(16) for name in COLUMNS}
+
+    def _new_column(self, capacity):
+        if numpy is not None:
+            return numpy.zeros(capacity, numpy.int32)
+        return array('i')
+
+    def _row(self, cowboy):
+        tile = cowboy._tile
+        players = self.game._players
+        jobs = self.game._jobs
+        return {
+            'health': cowboy._health,
+            'turns_busy': cowboy._turns_busy,
+            'focus': cowboy._focus,
+            'tolerance': cowboy._tolerance,
+            'x': tile._x if tile is not None else -1,
+            'y': tile._y if tile is not None else -1,
+            'is_drunk': int(cowboy._is_drunk),
+            'is_dead': int(cowboy._is_dead),
+            'can_move': int(cowboy._can_move),
+            'owner': players.index(cowboy._owner) if cowboy._owner in players else -1,
+            'job': jobs.index(cowboy._job) if cowboy._job in jobs else -1
+        }
+
+    def add(self, cowboy):
+        """ gives the cowboy the next slot, filled in from its fields """
+        slot = self.slots[cowboy] = len(self.cowboys)
+        self.cowboys.append(cowboy)
+        row = self._row(cowboy)
+        for name, column in self._columns.items():
+            if numpy is None:
+                column.append(row[name])
+                continue
+            if slot == len(column):  # full, so double it
+                grown = self._new_column(2 * len(column))
+                grown[:slot] = column
+                column = self._columns[name] = grown
+            column[slot] = row[name]
+
+    def apply(self, journal):
+        """ adds the cowboys the ChangeJournal of a delta says it created, and sets the cells of the fields it changed """
+        for obj in journal.created:
+            if isinstance(obj, Cowboy):
+                self.add(obj)
+        slots = self.slots
+        columns = self._columns
+        for field in _FIELDS:
+            for obj, _, _, new in journal.of(field):
+                slot = slots.get(obj)
+                if slot is None:
+                    continue
+                if field == 'tile':
+                    columns['x'][slot] = new._x if new is not None else -1
+                    columns['y'][slot] = new._y if new is not None else -1
+                else:
+                    columns[field][slot] = self._value(field, new)
+
+    def column(self, name):
+        """ the column (e.g. 'turns_busy') with a cell for every slot, as a NumPy array (a view) when NumPy is installed """
+        column = self._columns[name]
+        return column[:len(self.cowboys)] if numpy is not None else column
+
+    def _value(self, name, value):
+        """ value as it is stored in the column name, e.g. the index of a Player for 'owner' """
+        if name == 'owner':
+            return self.game._players.index(value) if value in self.game._players else -1
+        if name == 'job':
+            return self.game._jobs.index(value) if value in self.game._jobs else -1
+        return int(value)
+
+    def where(self, **conditions):
+        """ the cowboys, in slot order, whose columns equal every condition, e.g. where(owner=player, is_dead=False, turns_busy=0) """
+        if numpy is not None:
+            matches = numpy.ones(len(self.cowboys), bool)
+            for name, value in conditions.items():
+                matches &= self.column(name) == self._value(name, value)
+            return [self.cowboys[slot] for slot in numpy.flatnonzero(matches).tolist()]
+        wanted = [(self._columns[name], self._value(name, value)) for name, value in conditions.items()]
+        return [cowboy for slot, cowboy in enumerate(self.cowboys) if all(column[slot] == value for column, value in wanted)]
+
+    def distances(self, tile):
+        """ the Manhattan distance from every slot's cowboy to the tile, as a column (meaningless for cowboys with no tile, whose x and y are -1) """
+        if numpy is not None:
+            return numpy.abs(self.column('x') - tile._x) + numpy.abs(self.column('y') - tile._y)
+        x, y = tile._x, tile._y
+        return array('i', (abs(cx - x) + abs(cy - y) for cx, cy in zip(self._columns['x'], self._columns['y'])))
@@ -14,6 +14,10 @@ class Furnishing(GameObject):
     An furnishing in the Saloon that must be pathed around, or destroyed.
     """
 
+    __slots__ = ('_health', '_is_destroyed', '_is_piano', '_is_playing', '_tile',
+        # the AI's own fields on it
+        'owner')
+
     def __init__(self):
         """Initializes a Furnishing with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -14,6 +14,10 @@ from games.saloon.game_object import GameObject
 from games.saloon.player import Player
 from games.saloon.tile import Tile
 from games.saloon.young_gun import YoungGun
+from games.saloon.grid import Grid
+from games.saloon.board import Layers
+from games.saloon.cowboy_index import CowboyIndex
+from games.saloon.cowboy_store import CowboyStore
 
 
 
@@ -61,6 +65,11 @@ class Game(BaseGame):
             'YoungGun': YoungGun
         }
 
+        self._tile_grid = None
+        self._board_layers = None
+        self._indexed_cowboys = CowboyIndex()
+        self._cowboy_columns = CowboyStore(self)
+
 
     @property
     def bartender_cooldown(self):
@@ -255,4 +264,52 @@ class Game(BaseGame):
             # out of bounds
             return None
 
-        return self.tiles[x + y * self.mapWidth]
+        return self._tile_grid.at(x, y)
+
+    # Custom stuff
+    @property
+    def grid(self):
+        """The map indexed by tile id (y * map_width + x), with each tile's neighbors' ids, None until the first delta is in.
+
+        :rtype: Grid
+        """
+        return self._tile_grid
+
+    @property
+    def layers(self):
+        """The board as NumPy arrays, kept up to date with every delta. None without NumPy, or until the first delta is in.
+
+        :rtype: Layers
+        """
+        return self._board_layers
+
+    @property
+    def cowboy_index(self):
+        """Every player's cowboys by job, and if they are alive and can move, kept up to date with every delta. See Player.cowboys_of.
+
+        :rtype: CowboyIndex
+        """
+        return self._indexed_cowboys
+
+    @property
+    def cowboy_store(self):
+        """Every cowboy's numbers as columns (NumPy arrays, when it is installed), kept up to date with every delta, for scoring them all at once.
+
+        :rtype: CowboyStore
+        """
+        return self._cowboy_columns
+
+    def _delta_applied(self, journal):
+        # the tiles' neighbors and places are set by the first delta, and frozen into them and the grid then. Later deltas never change them, but are checked in case
+        linked = journal.changed(Tile, 'tile_north', 'tile_east', 'tile_south', 'tile_west')
+        for tile in linked:
+            tile._freeze_adjacency()
+        if linked or journal.changed(Tile, 'x', 'y') or journal.of('map_width') or journal.of('map_height')\
+                or any(field == 'tiles' for _, field, _, _ in journal.resizes):
+            self._tile_grid = Grid(self._map_width, self._map_height, self._tiles)
+            if Layers.available:
+                self._board_layers = Layers(self)
+        elif self._board_layers is not None:
+            self._board_layers.apply(journal)
+        self._indexed_cowboys.apply(journal)
+        self._cowboy_columns.apply(journal)
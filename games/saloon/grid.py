@@ -0,0 +1,47 @@
+class Grid(object):
+    """
+    The map as a dense integer index, built by the Game whenever its tiles
+    change (so, once the first delta is in).
+
+    Every tile's id on the grid is y * width + x, so tiles can be found by
+    (x, y) in O(1), and pathfinding can keep plain lists indexed by tile id
+    instead of dicts keyed by tiles. Each tile knows its own id and grid, as
+    tile._grid_id and tile._grid.
+    """
+
+    def __init__(self, width, height, tiles):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.tiles = [None] * self.size  # tile id: Tile
+        for tile in tiles:
+            if tile is not None and 0 <= tile._x < width and 0 <= tile._y < height:
+                tile._grid_id = tile._y * width + tile._x
+                tile._grid = self
+                self.tiles[tile._grid_id] = tile
+
+        # tile id: the ids of its neighbors, in the orders of Tile.neighbors and Tile.hor_neighbors
+        self.neighbor_ids = [tuple(n._grid_id for n in tile._neighbor_tiles) if tile else () for tile in self.tiles]
+        self.hor_neighbor_ids = [tuple(n._grid_id for n in tile._hor_neighbor_tiles) if tile else () for tile in self.tiles]
+
+    def id_of(self, tile):
+        return tile._y * self.width + tile._x
+
+    def at(self, x, y):
+        """ The Tile at (x, y), or None if that is off the map """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.tiles[y * self.width + x]
+        return None
+
+    def path(self, parents, id):
+        """
+        The tiles from the start of a search to the tile id, following
+        parents (a list of tile ids, -1 for the start's) back from it
+        """
+        path = []
+        tiles = self.tiles
+        while id >= 0:
+            path.append(tiles[id])
+            id = parents[id]
+        path.reverse()
+        return path
@@ -14,6 +14,10 @@ class Player(GameObject):
     A player in this game. Every AI controls one player.
     """
 
+    __slots__ = ('_client_type', '_cowboys', '_kills', '_lost', '_name', '_opponent', '_reason_lost', '_reason_won', '_rowdiness', '_score', '_siesta', '_time_remaining', '_won', '_young_gun',
+        # the Game's CowboyIndex, which it sets once the player is in it
+        '_cowboy_index')
+
     def __init__(self):
         """Initializes a Player with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -34,6 +38,7 @@ class Player(GameObject):
         self._won = False
         self._young_gun = None
 
+        self._cowboy_index = None
 
 
     @property
@@ -160,3 +165,16 @@ class Player(GameObject):
         :rtype: YoungGun
         """
         return self._young_gun
+
+    # Custom stuff
+    def cowboys_of(self, job=None, alive=None, can_move=None):
+        """ This player's cowboys with the job (e.g. 'Brawler'), and alive and able to move, each only if given, from the Game's CowboyIndex.
+
+        Returns:
+            list[Cowboy]: in the order of cowboys
+        """
+        return self._cowboy_index.cowboys(self, job, alive, can_move)
+
+    def count_cowboys(self, job=None, alive=None, can_move=None):
+        """ How many cowboys cowboys_of(job, alive, can_move) would give, without listing them """
+        return self._cowboy_index.count(self, job, alive, can_move)
@@ -0,0 +1,176 @@
+import threading
+import traceback
+
+from games.saloon.bottle import Bottle
+from games.saloon.furnishing import Furnishing
+from games.saloon.util import distance_field, threatened_tiles
+
+
+def piano_goal(tile):
+    return tile.furnishing and tile.furnishing.is_piano
+
+def static_wall(tile):
+    return tile.furnishing or tile.is_balcony
+
+def walls_key(game):
+    """ Everything a distance_field with piano_goal and static_wall depends on """
+    return frozenset((f.id, f.tile.id, f.is_piano) for f in game.furnishings if not f.is_destroyed and f.tile)
+
+def walls_key_of(furnishings):
+    """ walls_key, from the Snapshot records of the furnishings that aren't destroyed """
+    return frozenset((f.id, f.tile, f.is_piano) for f in furnishings)
+
+def live_bottles(game):
+    """ (tile, direction) of every bottle still flying """
+    return [(b.tile, b.direction.lower()) for b in game.bottles if not b.is_destroyed and b.tile]
+
+def bottles_key(bottles):
+    return frozenset((tile.id, direction) for tile, direction in bottles)
+
+
+class Board(object):
+    """
+    What the ponder thread needs of the board, from a Snapshot taken on the
+    main thread, so it never reads game objects while deltas are merged into
+    them. Only the tiles' adjacency, which merging never changes, is read
+    from the Tiles themselves.
+    """
+
+    def __init__(self, game, snapshot):
+        self.tiles = {tile.id: tile for tile in game.grid.tiles if tile is not None}
+        self.records = {tile: snapshot.get(tile.id) for tile in self.tiles.values()}  # Tile: its record
+        furnishings = [f for f in snapshot.all(Furnishing) if not f.is_destroyed and f.tile]
+        self.walls = walls_key_of(furnishings)
+        self.pianos = {self.tiles[f.tile] for f in furnishings if f.is_piano}
+        self.blocked = {self.tiles[f.tile] for f in furnishings} | {tile for tile, record in self.records.items() if record.is_balcony}
+        self.bottles = [(self.tiles[b.tile], b.direction.lower()) for b in snapshot.all(Bottle) if not b.is_destroyed and b.tile]
+
+    def predict_bottles(self):
+        """ Where the live bottles will be after they move once, those about to break left out """
+        predicted = []
+        for tile, direction in self.bottles:
+            n = tile.get_dir(direction)
+            if n and n not in self.blocked and not self.records[n].cowboy:
+                predicted.append((n, direction))
+        return predicted
+
+    def field(self, start):
+        """ distance_field(start, piano_goal, static_wall) on this board """
+        return distance_field(start, self.pianos.__contains__, self.blocked.__contains__)
+
+
+class Pondered(object):
+    """ What was found for a turn, along with the state each piece was found from """
+
+    def __init__(self):
+        self.bottles = None
+        self.danger = None  # threatened_tiles of the bottles
+        self.walls = None
+        self.fields = {}  # start tile: distance_field(start, piano_goal, static_wall)
+
+    def field(self, game, start):
+        """ The distance field from start, found now if it wasn't already """
+        if self.walls is None:
+            self.walls = walls_key(game)
+        if start not in self.fields:
+            self.fields[start] = distance_field(start, piano_goal, static_wall)
+        return self.fields[start]
+
+
+def find_bottles(pondered, bottles):
+    pondered.bottles = bottles_key(bottles)
+    pondered.danger = threatened_tiles(bottles)
+
+
+class Ponder(object):
+    """
+    Uses the time the opponent spends on their turn to precompute what our next
+    turn will likely need, on a background thread:
+      where bottles are about to fly through, once they have moved for the opponent's turn,
+      and the distance field to the pianos from our call in tile, which
+      generate_starting_assignments plans from.
+    Distance fields from each of our cowboys aren't pondered, as nothing reads
+    them: a strategy that wants them should ask ai.pondered.field for them,
+    and have _run find them for its start tiles too.
+    Piano slots and owners aren't pondered either, AI.update_board keeps them.
+
+    Pondering starts from the first state after our turn ends, working from a
+    Snapshot of it (see Board). Every delta bumps the generation, so take()
+    can tell when nothing changed since, and otherwise checks each piece
+    against the state it was found from, finding it again if it no longer
+    holds.
+    """
+
+    def __init__(self, ai):
+        self.ai = ai
+        self.generation = 0
+        self.reused = 0
+        self.discarded = 0
+        self._pending = False
+        self._thread = None
+        self._stop = threading.Event()
+        self._pondered = None
+        self._failed = None  # the traceback of the exception the last ponder raised, printed by take()
+        self._started_generation = None
+
+    def turn_over(self):
+        """ Our turn is done, ponder once the state after it comes in """
+        self._pending = True
+
+    def updated(self):
+        """ Call on every game_updated, after the AI's snapshots recorded the delta """
+        self.generation += 1
+        if self._pending and self._thread is None:
+            self._pending = False
+            self._stop.clear()
+            self._started_generation = self.generation
+            snapshot = self.ai.snapshots.at()
+            self._thread = threading.Thread(target=self._run, args=(snapshot,), name='ponder', daemon=True)
+            self._thread.start()
+
+    def _run(self, snapshot):
+        game = self.ai.game
+        pondered = Pondered()
+        try:
+            board = Board(game, snapshot)
+            find_bottles(pondered, board.predict_bottles())
+            young_gun = snapshot.get(self.ai.player.young_gun.id)
+            spawn = board.tiles.get(young_gun.call_in_tile) if young_gun else None
+            if spawn and not self._stop.is_set():
+                pondered.walls = board.walls
+                pondered.fields[spawn] = board.field(spawn)
+        except Exception:
+            self._failed = traceback.format_exc()
+        self._pondered = pondered
+
+    def take(self):
+        """ Stops pondering, returning a Pondered for the current state, reusing whatever still holds """
+        game = self.ai.game
+        pondered = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            pondered, self._pondered = self._pondered, None
+        if self._failed:
+            print('Ponder failed, finding it all again:\n' + self._failed)
+            self._failed = None
+
+        if pondered is None:
+            pondered = Pondered()
+        elif self.generation != self._started_generation:  # Deltas came in since it started
+            if pondered.bottles != bottles_key(live_bottles(game)):
+                pondered.bottles = pondered.danger = None
+            if pondered.walls != walls_key(game):
+                pondered.walls = None
+                pondered.fields = {}
+
+        for piece in (pondered.danger, pondered.walls):
+            if piece is None:
+                self.discarded += 1
+            else:
+                self.reused += 1
+
+        if pondered.danger is None:
+            find_bottles(pondered, live_bottles(game))
+        return pondered
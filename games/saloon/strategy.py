@@ -3,11 +3,14 @@ from collections import OrderedDict, deque
 
 from games.saloon.util import shortest_pairs, cowboy_bfs, transpose, opposite,\
         get_spawn_tile, is_near_enemy_piano, bfs, alignment, paths_to_all_goals,\
-        safe, follow
+        safe
+from games.saloon.tile import direction_index
+from games.saloon.budget import expired
 from games.saloon.asciivis import draw_everything, general_tile_func
 
 
 _dirs = ['east', 'north', 'west', 'south']
+_dir_indexes = [(direction, direction_index(direction)) for direction in _dirs] # with their index in tile.adjacent
 
 def best_drunk_direction(target_tile):
     """
@@ -15,10 +18,10 @@ def best_drunk_direction(target_tile):
     If a piano is found in a direction but no wall, then return direction away from piano
     """
     best = None, 5
-    for direction in _dirs:
+    for direction, index in _dir_indexes:
         tile = target_tile
         for distance in range(best[1]):
-            tile = tile.get_dir(direction)
+            tile = tile._adjacent_tiles[index]
             if not tile:
                 break
             if tile.furnishing and tile.furnishing.is_piano:
@@ -37,11 +40,11 @@ def best_bang_direction(sharpshooter):
     Or None if no good shot.
     """
     best = None, 0
-    for direction in _dirs:
+    for direction, index in _dir_indexes:
         tile = sharpshooter.tile
         enemies = 0
         for _ in range(sharpshooter.focus):
-            tile = tile.get_dir(direction)
+            tile = tile._adjacent_tiles[index]
             if not tile:
                 break
             if tile.cowboy:
@@ -69,7 +72,7 @@ def spawn_everything(ai):
     if t.cowboy and t.cowboy.owner == ai.player:
         return
     for job in ai.game.jobs:
-        if sum(1 for c in ai.player.cowboys if c.job == job) < ai.game.max_cowboys_per_job:
+        if ai.player.count_cowboys(job) < ai.game.max_cowboys_per_job:
             ai.player.young_gun.call_in(job)
             break
 
@@ -102,7 +105,7 @@ def assign_pianos(ai):
     Prefer assigining sharpshooters to spots which don't shoot our own stuff
     Prefer assigning brawlers to enemy pianos
     """
-    cowboys = [c for c in ai.player.cowboys if c.can_move and not c._is_dead]
+    cowboys = ai.player.cowboys_of(alive=True, can_move=True)
     spots = list()
     for piano in ai.pianos:
         for n in piano.tile.neighbors:
@@ -120,7 +123,7 @@ def assign_pianos(ai):
     brawler_spots = [s for s in spots if s.piano.owner != ai.player]
 
     # Assign brawlers
-    brawlers = [c for c in cowboys if c.job == 'Brawler']
+    brawlers = ai.player.cowboys_of('Brawler', alive=True, can_move=True)
     def goal_func(t):
         return t in brawler_spots
     for brawler in brawlers:  # TODO: Wait to spawn brawlers until they align with enemy pianos/spots
@@ -135,7 +138,7 @@ def assign_pianos(ai):
     # Find good sharpshooter spots
     sharpshooter_spots = good_sharpshooter_spots(ai, spots)
     # Assign sharpshooters
-    sharpshooters = [c for c in cowboys if c.job == 'Sharpshooter']
+    sharpshooters = ai.player.cowboys_of('Sharpshooter', alive=True, can_move=True)
     def wall_func(t):
         return t.is_balcony or t.has_hazard or t.furnishing or (t.cowboy and\
                 t.cowboy.owner != ai.player)
@@ -295,8 +298,11 @@ def brawl_enemy_pianos(ai):
                 print('b3')
                 brawler.move_pref(path[1])  # TODO: Outaway
 
-def play_pianos(ai):
+def play_pianos(ai, deadline=None):
+    """ Plays every piano next to one of our cowboys, stopping once the deadline passes """
     for cowboy in ai.player.cowboys:
+        if expired(deadline):
+            break
         if cowboy._is_dead or cowboy.turns_busy:
             continue
         for neighbor in cowboy.tile.neighbors:
@@ -307,8 +313,7 @@ def play_pianos(ai):
 
 def shoot_enemy_pianos(ai):
     """ When a sharpshooter has waited long enough, tell him to move and shoot the enemy piano """
-    sharpshooters = [c for c in ai.player.cowboys if not c._is_dead and
-            c.job == 'Sharpshooter' and c.turns_busy == 0]
+    sharpshooters = [c for c in ai.player.cowboys_of('Sharpshooter', alive=True) if c.turns_busy == 0]
     for c in sharpshooters:
         dir = best_bang_direction(c)
         if dir:
@@ -323,10 +328,10 @@ def best_throw_direction(bartender):
     Or None if no good shot.
     """
     best = None, 15, None
-    for direction in _dirs:
+    for direction, index in _dir_indexes:
         tile = bartender.tile
         for distance in range(best[1]):
-            tile = tile.get_dir(direction)
+            tile = tile._adjacent_tiles[index]
             if not tile:
                 break
             if tile.furnishing or tile.is_balcony:
@@ -393,7 +398,8 @@ def generate_starting_assignments(ai):
         return t.furnishing and t.furnishing.is_piano
     def wall_func(t):
         return t.furnishing or t.is_balcony
-    piano_paths = paths_to_all_goals(spawn, goal_func, wall_func)
+    field = ai.pondered.field(ai.game, spawn) if getattr(ai, 'pondered', None) else None
+    piano_paths = paths_to_all_goals(spawn, goal_func, wall_func, field)
     # Choose only 6 closest
     piano_paths = list(sorted(((goal, path) for goal, path in piano_paths),
         key=lambda p: len(p[1])))[:6]
@@ -427,16 +433,30 @@ def generate_assignments(ai):
 
 
     
-def move_starting_cowboys(ai):
+def follow_assignment(cowboy):
+    """ The fallback of move_starting_cowboys: a step along the cowboy's assignment if the next tile is open and safe, finding no new paths """
+    path = getattr(cowboy, 'assignment', None)
+    if path and cowboy.tile in path:
+        i = path.index(cowboy.tile)
+        if i < len(path) - 2:
+            target = path[i + 1]
+            if not target.cowboy and not target.furnishing and safe(target):
+                cowboy.move(target)
+
+def move_starting_cowboys(ai, deadline=None):
     """
     Uses generate_starting_assignments 
+    Once the deadline passes, the cowboys left only follow_assignment, and no one is called in
     """
-    cowboys_to_do = deque(reversed(ai.player.cowboys))
+    cowboys_to_do = deque(reversed(ai.player.cowboys_of(can_move=True)))
     #print(' '.join(str(c.id) for c in cowboys_to_do))
     while cowboys_to_do:
         cowboy = cowboys_to_do.pop()
         if not cowboy.can_move:
             continue
+        if expired(deadline):
+            follow_assignment(cowboy)
+            continue
         # Move to assignment
         path = cowboy.assignment
         try:
@@ -557,6 +577,8 @@ def move_starting_cowboys(ai):
                         pass  # TODO attack
         except Exception:  # hahaha so bad
             pass
+    if expired(deadline):
+        return
     try:
         t = ai.game.current_turn // 2
         if t < 4:
@@ -571,7 +593,7 @@ def move_starting_cowboys(ai):
         elif t > 8: # Spawn everything else
             y = ai.player.young_gun
             for job in ['Brawler', 'Sharpshooter', 'Bartender']:
-                if sum(1 for c in ai.player.cowboys if c.job == job and not c.is_dead) < 2:
+                if ai.player.count_cowboys(job, alive=True) < 2:
                     if y.can_call_in:
                         t = y.call_in_tile
                         # Stomp enemies and non-pianos
@@ -637,22 +659,28 @@ def _safe_goal_func(ai, t, alive_pianos):
     return False
 def safe_bfs(ai, start, goal_func=_safe_goal_func, wall_func=_safe_wall_func):
     alive_pianos = sum(1 for f in ai.game.furnishings if not f.is_destroyed)
+    grid = start._grid
+    tiles = grid.tiles
+    neighbor_ids = grid.neighbor_ids
     frontier = deque()
-    frontier.append(start)
-    parents = {start: None}
-    dist = {start: 0}
+    frontier.append(start._grid_id)
+    parents = [None] * grid.size
+    parents[start._grid_id] = -1
+    dist = [None] * grid.size
+    dist[start._grid_id] = 0
     while frontier:
         top = frontier.popleft()
-        if goal_func(ai, top, alive_pianos):
-            path = list(reversed(list(follow(parents, top))))
+        if goal_func(ai, tiles[top], alive_pianos):
+            path = grid.path(parents, top)
             if len(path) >= 1:
-                path += [goal_func(ai, top, alive_pianos)]  # Add the piano on to the end of the path
+                path += [goal_func(ai, tiles[top], alive_pianos)]  # Add the piano on to the end of the path
             return path
-        for neighbor in top.neighbors:
-            if wall_func(dist[top], neighbor) and not goal_func(ai, neighbor, alive_pianos):
-                continue
-            if neighbor not in parents:
-                frontier.append(neighbor)
-                parents[neighbor] = top
-                dist[neighbor] = dist[top] + 1
+        for id in neighbor_ids[top]:
+            if parents[id] is None:
+                neighbor = tiles[id]
+                if wall_func(dist[top], neighbor) and not goal_func(ai, neighbor, alive_pianos):
+                    continue
+                frontier.append(id)
+                parents[id] = top
+                dist[id] = dist[top] + 1
 
@@ -6,6 +6,19 @@
 
 from games.saloon.game_object import GameObject
 
+# the indexes of Tile.adjacent, in the order of Tile.directions
+NORTH, EAST, SOUTH, WEST = range(4)
+
+_direction_indexes = {}
+for _index, _direction in enumerate(["North", "East", "South", "West"]):
+    _direction_indexes[_direction] = _direction_indexes[_direction.lower()] = _index
+
+def direction_index(direction):
+    """ the index in Tile.adjacent of a direction, e.g. "North", "north", or "NORTH" """
+    index = _direction_indexes.get(direction)
+    if index is None:
+        index = _direction_indexes[direction.lower()]
+    return index
 
 
 class Tile(GameObject):
@@ -14,6 +27,12 @@ class Tile(GameObject):
     A Tile in the game that makes up the 2D map grid.
     """
 
+    __slots__ = ('_bottle', '_cowboy', '_furnishing', '_has_hazard', '_is_balcony', '_tile_east', '_tile_north', '_tile_south', '_tile_west', '_x', '_y', '_young_gun',
+        # its adjacency, frozen by the Game once the map is in, and its place on the Game's grid
+        '_adjacent_tiles', '_neighbor_tiles', '_hor_neighbor_tiles', '_grid_id', '_grid',
+        # the AI's own fields on it
+        'danger', 'piano')
+
     def __init__(self):
         """Initializes a Tile with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -32,6 +51,15 @@ class Tile(GameObject):
         self._y = 0
         self._young_gun = None
 
+        self._adjacent_tiles = (None, None, None, None)
+        self._neighbor_tiles = ()
+        self._hor_neighbor_tiles = ()
+        self._grid_id = -1
+        self._grid = None
+
+        self.danger = None  # If a bottle will reach here within two moves, when precomputed for this turn, None outside our turn
+        self.piano = None  # The piano this tile is next to, kept by AI.update_board
+
 
 
     @property
@@ -146,13 +174,27 @@ class Tile(GameObject):
     """
 
     # Custom stuff
+    # which tiles are next to which never changes after the first delta, so the Game freezes it into tuples once it is in
+    def _freeze_adjacency(self):
+        north, east, south, west = self._adjacent_tiles = (self._tile_north, self._tile_east, self._tile_south, self._tile_west)
+        self._neighbor_tiles = tuple(t for t in (north, south, east, west) if t)
+        self._hor_neighbor_tiles = tuple(t for t in (east, west, north, south) if t)
+
+    @property
+    def adjacent(self):
+        """The tiles to the north, east, south and west of this one (see NORTH, EAST, SOUTH and WEST), None where the map ends.
+
+        :rtype: tuple[Tile]
+        """
+        return self._adjacent_tiles
+
     @property
     def neighbors(self):
-        return [t for t in [self._tile_north, self._tile_south, self._tile_east, self._tile_west] if t]
+        return self._neighbor_tiles
 
     @property
     def hor_neighbors(self):
-        return [t for t in [self._tile_east, self._tile_west, self._tile_north, self._tile_south] if t]
+        return self._hor_neighbor_tiles
 
     @property
     def pos(self):
@@ -162,7 +204,7 @@ class Tile(GameObject):
         return abs(self._x - other._x) + abs(self._y - other._y)
 
     def get_dir(self, dir):
-        return getattr(self, 'tile_' + dir.lower())
+        return self._adjacent_tiles[direction_index(dir)]
 
     def __str__(self):
         return "({}, {})".format(self._x, self._y)
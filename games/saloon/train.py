@@ -1,21 +1,24 @@
 from games.saloon.util import _dirs
 from games.saloon.strategy import move_to
+from games.saloon.budget import expired
 
-def train_strat(self):
+def train_strat(self, deadline=None):
+    """ Once the deadline passes, cowboys stop finding paths (to hazards, or to pianos), but still play the pianos next to them """
     p = self.player
     y = self.player.young_gun
     t = self.game.current_turn
 
     rot_right = {'east': 'south', 'south': 'west', 'west': 'north', 'north': 'east'}
 
-    bartenders = [c for c in p.cowboys if c.job == 'Bartender' and not c.is_dead]
-    brawlers = [c for c in p.cowboys if c.job == 'Brawler' and not c.is_dead]
-    sharpshooters = [c for c in p.cowboys if c.job == 'Sharpshooter' and not c.is_dead]
+    bartenders = p.cowboys_of('Bartender', alive=True)
+    brawlers = p.cowboys_of('Brawler', alive=True)
+    sharpshooters = p.cowboys_of('Sharpshooter', alive=True)
 
     def kill(cowboy):
         def goal_func(t):
             return t.has_hazard
-        move_to(self, cowboy, goal_func)
+        if not expired(deadline):
+            move_to(self, cowboy, goal_func)
 
     if t in [0, 1]:
         y.call_in('Brawler')
@@ -85,7 +88,8 @@ def train_strat(self):
                 if n.furnishing and n.furnishing.is_piano:
                     return True
             return False
-        move_to(self, s, goal_func)
+        if not expired(deadline):
+            move_to(self, s, goal_func)
         for n in s.tile.neighbors:
             if n.furnishing and n.furnishing.is_piano:
                 s.play(n.furnishing)
@@ -1,4 +1,5 @@
 from collections import deque
+from games.saloon.tile import NORTH, EAST, SOUTH, WEST, direction_index
 
 
 def follow(parent_dict, start):
@@ -15,26 +16,25 @@ def follow(parent_dict, start):
         pass
 
 
-def _bfs_neighbors(tile):
-    yield from tile.neighbors
 def bfs(start, goal_func, wall_func, hor=False):
-    neighbors = _bfs_neighbors
-    if hor:
-        def neighbors(tile):
-            yield from tile.hor_neighbors
+    grid = start._grid
+    tiles = grid.tiles
+    neighbor_ids = grid.hor_neighbor_ids if hor else grid.neighbor_ids
     frontier = deque()
-    frontier.append(start)
-    parents = {start: None}
+    frontier.append(start._grid_id)
+    parents = [None] * grid.size  # tile id: the id it was reached from, -1 for start's
+    parents[start._grid_id] = -1
     while frontier:
         top = frontier.popleft()
-        if goal_func(top):
-            return list(reversed(list(follow(parents, top))))
-        for neighbor in neighbors(top):
-            if wall_func(neighbor) and not goal_func(neighbor):
-                continue
-            if neighbor not in parents:
-                frontier.append(neighbor)
-                parents[neighbor] = top
+        if goal_func(tiles[top]):
+            return grid.path(parents, top)
+        for id in neighbor_ids[top]:
+            if parents[id] is None:
+                neighbor = tiles[id]
+                if wall_func(neighbor) and not goal_func(neighbor):
+                    continue
+                frontier.append(id)
+                parents[id] = top
 
 
 def cowboy_bfs(cowboy, goal_func):
@@ -98,7 +98,7 @@ def flood_path(starts, wall_func):
     parents = {t: t for t in starts}
     while frontier:
         top = frontier.popleft()
-        for neighbor in top.neighbors:
+        for neighbor in top._neighbor_tiles:
             if not wall_func(neighbor) and neighbor not in parents:
                 frontier.append(neighbor)
                 parents[neighbor] = top
@@ -111,7 +111,7 @@ def flood_path_fast(starts, wall_func):
     try:
         while True:
             top = frontier.popleft()
-            for neighbor in top.neighbors:
+            for neighbor in top._neighbor_tiles:
                 if not wall_func(neighbor) and neighbor not in parents:
                     frontier.append(neighbor)
                     parents[neighbor] = top
@@ -129,34 +129,38 @@ def opposite(direction):
     return _opposite[direction.lower()]
 
 _dirs = ['north', 'south', 'east', 'west']
+_threats = [(NORTH, 'south'), (SOUTH, 'north'), (EAST, 'west'), (WEST, 'east')] # the adjacent tile, and the direction a bottle there comes from it in
 def safe(tile):
     if tile.bottle:
         return False
     # Detect if a bottle will be here in two turns
     if not tile._is_balcony and not tile.furnishing and not tile.cowboy:
-        for dir in _dirs:
-            n = tile.get_dir(dir)
+        if tile.danger is not None:  # Already worked out this turn
+            return not tile.danger
+        for index, coming in _threats:
+            n = tile._adjacent_tiles[index]
             if n:
-                if n.bottle and n.bottle.direction.lower() == opposite(dir):
+                if n._bottle and n._bottle.direction.lower() == coming:
                     return False
-                n = n.get_dir(dir)
+                n = n._adjacent_tiles[index]
                 if n:
-                    if n.bottle and n.bottle.direction.lower() == opposite(dir):
+                    if n._bottle and n._bottle.direction.lower() == coming:
                         return False
         return True
     return True
 
 def get_spawn_tile(player):
     t = player.young_gun.tile
-    if t.x == 0:
-        if t.y == 0:
+    north, east, south, west = t._adjacent_tiles  # None past the edges of the map, whatever its size
+    if west is None:
+        if north is None:
             return t.tile_south.tile_east
-        elif t.y == 11:
+        elif south is None:
             return t.tile_north.tile_east
-    elif t.x == 21:
-        if t.y == 0:
+    elif east is None:
+        if north is None:
             return t.tile_south.tile_west
-        elif t.y == 11:
+        elif south is None:
             return t.tile_north.tile_west
     for n in t.neighbors:
         if not n._is_balcony:
@@ -191,30 +195,68 @@ def classify_pianos(ai):
             piano.owner = ai.player
 
 def set_tile_piano(ai):
-    for tile in ai.game.tiles:
-        tile.piano = None
-    for furnishing in ai.game.furnishings:
-        if furnishing.is_piano:
-            for n in furnishing.tile.neighbors:
-                n.piano = furnishing
-
-def paths_to_all_goals(start, goal_func, wall_func):
+    """ Sets tile.piano to the piano (of ai.pianos) the tile is next to, only touching the tiles whose piano changed since the last call """
+    slots = {n: piano for piano in ai.pianos for n in piano.tile.neighbors}
+    old = ai.piano_slots
+    for tile in old:
+        if tile not in slots:
+            tile.piano = None
+    for tile, piano in slots.items():
+        if old.get(tile) is not piano:
+            tile.piano = piano
+    ai.piano_slots = slots
+
+def distance_field(start, goal_func, wall_func):
+    """
+    BFS from start, stopping at goals instead of going through them
+    Returns (distances, parents, goals), distances and parents lists indexed
+    by tile id (None where not reached, the start's parent is -1), goals the
+    tiles in the order they were reached
+    """
+    grid = start._grid
+    tiles = grid.tiles
+    neighbor_ids = grid.neighbor_ids
     frontier = deque()
-    frontier.append(start)
+    frontier.append(start._grid_id)
     goals = []
-    parents = {start: None}
+    parents = [None] * grid.size
+    parents[start._grid_id] = -1
+    distances = [None] * grid.size
+    distances[start._grid_id] = 0
     while frontier:
         top = frontier.popleft()
-        if goal_func(top):
-            goals.append((top, list(reversed(list(follow(parents, top))))))
+        if goal_func(tiles[top]):
+            goals.append(tiles[top])
             continue
-        for neighbor in top.neighbors:
-            if wall_func(neighbor) and not goal_func(neighbor):
-                continue
-            if neighbor not in parents:
-                frontier.append(neighbor)
-                parents[neighbor] = top
-    return goals
+        for id in neighbor_ids[top]:
+            if parents[id] is None:
+                neighbor = tiles[id]
+                if wall_func(neighbor) and not goal_func(neighbor):
+                    continue
+                frontier.append(id)
+                parents[id] = top
+                distances[id] = distances[top] + 1
+    return distances, parents, goals
+
+def paths_to_all_goals(start, goal_func, wall_func, field=None):
+    """ field is a distance_field already found from start with the same funcs """
+    distances, parents, goals = field or distance_field(start, goal_func, wall_func)
+    return [(goal, start._grid.path(parents, goal._grid_id)) for goal in goals]
+
+def threatened_tiles(bottles):
+    """
+    The tiles bottles will move into within their next two moves, from (tile, direction) pairs
+    A tile safe() would say a bottle is coming for, if nothing else is on it
+    """
+    threatened = set()
+    for tile, direction in bottles:
+        index = direction_index(direction)
+        for _ in range(2):
+            tile = tile._adjacent_tiles[index]
+            if not tile:
+                break
+            threatened.add(tile)
+    return threatened
 
 # Tests
 if False:
@@ -14,6 +14,8 @@ class YoungGun(GameObject):
     An eager young person that wants to join your gang, and will call in the veteran Cowboys you need to win the brawl in the saloon.
     """
 
+    __slots__ = ('_call_in_tile', '_can_call_in', '_owner', '_tile')
+
     def __init__(self):
         """Initializes a YoungGun with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -78,14 +80,15 @@ class YoungGun(GameObject):
     @property
     def next_call_in_tile(self):
         t = None
-        if self.tile.y == 0:
-            t = self.tile.get_dir('East') or self.tile.get_dir('South')
-        elif self.tile.x == 21:
-            t = self.tile.get_dir('South') or self.tile.get_dir('West')
-        elif self.tile.y == 11:
-            t = self.tile.get_dir('West') or self.tile.get_dir('North')
-        elif self.tile.x == 0:
-            t = self.tile.get_dir('North') or self.tile.get_dir('East')
+        north, east, south, west = self.tile._adjacent_tiles  # None past the edges of the map, whatever its size
+        if north is None:
+            t = east or south
+        elif east is None:
+            t = south or west
+        elif south is None:
+            t = west or north
+        elif west is None:
+            t = north or east
         else:
             print('NONONONONO')
         for n in t.neighbors:
@@ -0,0 +1,259 @@
+import asyncio
+import inspect
+import socket
+import sys
+import os
+import time
+from collections import deque
+from joueur.serializer import serialize, deserialize
+import joueur.codec as codec
+import joueur.telemetry as telemetry
+import joueur.error_code as error_code
+import joueur.ansi_color_coder as color
+import joueur.client
+
+EOT_BYTE = joueur.client.EOT_BYTE
+STREAM_LIMIT = 1 << 26 # the largest frame the stream will buffer, the initial delta of a big map is well under this
+
+# AsyncClient: an asyncio alternative to the joueur.client module. Frames are read by a task on the event loop, so they keep being serviced whenever the AI awaits.
+#   Game object commands (e.g. `await cowboy.move(tile)`) return awaitables, so independent ones can be sent together via asyncio.gather.
+#   AIs played through this should make run_turn (and any other orders) `async def`.
+class AsyncClient():
+    def __init__(self, print_io=False):
+        self._print_io = print_io
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._pending_runs = deque() # futures waiting on their "ran" event, in the order they were sent
+        self._sent_runs = deque() # (function name, when it was sent) of each of those, when telemetry is timing them
+        self._waiting_for = {} # event name to the future wait_for_event is awaiting it with
+        self._handed_back = None # resolved once the code awaiting an event has acted on it, frames read after that event wait for it
+        self._order_tasks = set()
+        self._send_buffer = bytearray() # events sent during one step of the event loop, written together once it yields
+        self.game = None
+        self.ai = None
+        self.manager = None
+
+    async def connect(self, server='localhost', port=3000):
+        self.server = server
+        self.port = int(port)
+
+        print(color.text("cyan") + "Connecting to:", self.server + ":" + str(self.port) + color.reset())
+
+        try:
+            self._reader, self._writer = await asyncio.open_connection(self.server, self.port, limit=STREAM_LIMIT)
+        except socket.error as e:
+            error_code.handle_error(error_code.COULD_NOT_CONNECT, e, "Could not connect to " + self.server + ":" + str(self.port))
+
+        sock = self._writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # sends are already coalesced, so don't let Nagle hold them back
+
+        self._read_task = asyncio.ensure_future(self._read_events())
+
+    def setup(self, game, ai, manager):
+        self.game = game
+        self.ai = ai
+        self.manager = manager
+        manager.set_client(self) # so game object commands get sent through here
+
+    def _send_raw(self, data):
+        if self._print_io:
+            print(color.text("magenta") + "TO SERVER --> " + str(data) + color.reset())
+        if len(self._send_buffer) == 0:
+            asyncio.get_event_loop().call_soon(self._flush)
+        self._send_buffer += data
+
+    def _flush(self):
+        if self._writer and len(self._send_buffer) > 0:
+            self._writer.write(bytes(self._send_buffer))
+            if telemetry.enabled:
+                telemetry.count("bytes_out", len(self._send_buffer))
+                telemetry.count("writes")
+        del self._send_buffer[:]
+
+    ## sends the server an event, without waiting for the write to finish. Everything sent before the loop next runs is written together
+    def send(self, event, data):
+        if telemetry.enabled:
+            telemetry.count("frames_out")
+            telemetry.count("events_out." + event)
+
+        self._send_raw(
+            codec.dumps({
+                'sentTime': int(time.time()),
+                'event': event,
+                'data': serialize(data)
+            })
+            + EOT_BYTE
+        )
+
+    def disconnect(self):
+        if self._read_task and self._read_task is not asyncio.current_task():
+            self._read_task.cancel()
+        if self._writer:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+    ## sends a command, returning a future for its result. Await it to get the result, nothing is blocked until then
+    def run_on_server(self, caller, function_name, args=None):
+        self.send("run", {
+            'caller': caller,
+            'functionName': function_name,
+            'args': args
+        })
+
+        future = asyncio.get_event_loop().create_future()
+        self._pending_runs.append(future)
+        if telemetry.enabled:
+            self._sent_runs.append((function_name, time.perf_counter()))
+        return future
+
+    async def wait_for_event(self, event):
+        future = asyncio.get_event_loop().create_future()
+        self._waiting_for[event] = future
+        self._hand_back()
+        return await future
+
+    async def play(self):
+        self._hand_back()
+        await self._read_task
+
+    ## lets the read task handle the frames after the last event waited for, called once its waiter waits for the next one or plays
+    def _hand_back(self):
+        if self._handed_back is not None and not self._handed_back.done():
+            self._handed_back.set_result(None)
+
+    ## reads frames off the stream for as long as it is open, handling each event as it arrives
+    async def _read_events(self):
+        while True:
+            try:
+                frame = await self._reader.readuntil(EOT_BYTE)
+            except asyncio.IncompleteReadError:
+                error_code.handle_error(error_code.DISCONNECTED_UNEXPECTEDLY, message="Server closed the connection while waiting for events")
+            except (asyncio.LimitOverrunError, socket.error) as e:
+                error_code.handle_error(error_code.CANNOT_READ_SOCKET, e, "Error reading socket while waiting for events")
+
+            if telemetry.enabled:
+                telemetry.count("bytes_in", len(frame)) # frames are read whole, so there are no reads to count apart from them
+            if self._print_io:
+                print(color.text("magenta") + "FROM SERVER <-- " + frame.decode("utf-8", "replace") + color.reset())
+
+            if telemetry.enabled:
+                started = time.perf_counter()
+
+            try:
+                sent = codec.loads(frame[:-1])
+            except ValueError as e:
+                error_code.handle_error(error_code.MALFORMED_JSON, e, "Could not parse json '" + frame.decode("utf-8", "replace") + "'")
+
+            if telemetry.enabled:
+                telemetry.record("json_parse", time.perf_counter() - started)
+                telemetry.count("frames_in")
+                telemetry.count("events_in." + sent['event'])
+
+            event = sent['event']
+            data = sent['data'] if 'data' in sent else None
+            waiting = self._waiting_for.pop(event, None)
+            if waiting:
+                self._handed_back = asyncio.get_event_loop().create_future()
+                waiting.set_result(data)
+                await self._handed_back # e.g. the constants from "lobbied" have to be set before a delta read with it is merged
+            else:
+                self._auto_handle(event, data)
+
+    ## called via the read task when data is sent
+    def _auto_handle(self, event, data=None):
+        auto_handle_function = getattr(self, "_auto_handle_" + event, None)
+
+        if auto_handle_function:
+            return auto_handle_function(data)
+        else:
+            error_code.handle_error(error_code.UNKNOWN_EVENT_FROM_SERVER, message=("Could not auto handle event '" + event + "'."))
+
+    def _auto_handle_delta(self, data):
+        if telemetry.enabled:
+            started = time.perf_counter()
+
+        try:
+            journal = self.manager.apply_delta_state(data)
+        except:
+            error_code.handle_error(error_code.DELTA_MERGE_FAILURE, sys.exc_info(), "Error merging delta")
+
+        if telemetry.enabled:
+            telemetry.record("delta_merge", time.perf_counter() - started)
+
+        if self.ai.player: # then the AI is ready for updates
+            self.ai.set_changes(journal)
+            self.ai.game_updated()
+
+    def _auto_handle_order(self, data):
+        task = asyncio.ensure_future(self._run_order(data))
+        self._order_tasks.add(task)
+        task.add_done_callback(self._order_tasks.discard)
+
+    ## runs an order as its own task, so the read task keeps handling "ran" and "delta" events while the AI awaits
+    async def _run_order(self, data):
+        if telemetry.enabled:
+            started = time.perf_counter()
+
+        args = deserialize(data['args'], self.game)
+        try:
+            returned = self.ai._do_order(data['name'], args)
+            if inspect.isawaitable(returned):
+                returned = await returned
+        except:
+            error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored executing order '" + data['name'] + "'.")
+
+        if len(self._pending_runs) > 0: # commands the AI never awaited still have to finish before the order does
+            await asyncio.gather(*self._pending_runs)
+
+        if telemetry.enabled:
+            telemetry.record("order." + data['name'], time.perf_counter() - started)
+
+        self.send("finished", {
+            'orderIndex': data['index'],
+            'returned': returned
+        })
+        self._flush()
+        await self._writer.drain()
+
+    def _auto_handle_ran(self, data):
+        if len(self._pending_runs) == 0:
+            error_code.handle_error(error_code.UNKNOWN_EVENT_FROM_SERVER, message="Got a 'ran' event with no command waiting on it.")
+
+        future = self._pending_runs.popleft()
+        if not future.cancelled():
+            future.set_result(deserialize(data, self.game))
+
+        if telemetry.enabled:
+            function_name, sent_at = self._sent_runs.popleft()
+            telemetry.record("run." + function_name, time.perf_counter() - sent_at)
+
+    def _auto_handle_invalid(self, data):
+        try:
+            self.ai.invalid(data['message'])
+        except:
+            error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored while handling invalid data.")
+
+    def _auto_handle_fatal(self, data):
+        error_code.handle_error(error_code.FATAL_EVENT, message="Got a fatal event from the server: " + data['message'])
+
+    def _auto_handle_over(self, data):
+        won = self.ai.player.won
+        reason = self.ai.player.reason_won if self.ai.player.won else self.ai.player.reason_lost
+
+        print(color.text("green") + "Game is over.", "I Won!" if won else "I Lost :(", "because: " + reason + color.reset())
+
+        try:
+            self.ai.end(won, reason)
+        except:
+            error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored during end.")
+
+        if 'message' in data:
+            print(color.text("cyan") + data['message'] + color.reset())
+
+        self.disconnect()
+        if telemetry.enabled:
+            print(color.text("cyan") + telemetry.summary() + color.reset())
+        os._exit(0)
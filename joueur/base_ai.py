@@ -1,18 +1,20 @@
 # NOTE: this file should not be modified by competitors
 from joueur.utilities import camel_case_converter
-import joueur.error_code as error_code
 import joueur.ansi_color_coder as color
-import sys
 
 # @class BaseAI: the basic AI functions that are the same between games
 class BaseAI:
     def __init__(self, game):
         self._game = game
         self._player = None
+        self._changes = None
 
     def set_player(self, player):
         self._player = player
 
+    def set_changes(self, journal):
+        self._changes = journal
+
     @property
     def game(self):
         """The reference to the Game instance this AI is playing.
@@ -29,6 +31,14 @@ class BaseAI:
         """
         return self._player
 
+    @property
+    def changes(self):
+        """ChangeJournal: What the delta merged just before this game_updated changed, so anything tracked can be updated instead of rebuilt. None when there was no delta, e.g. the first game_updated after start, so everything should be treated as changed.
+
+        :rtype: ChangeJournal
+        """
+        return self._changes
+
     # intended to be overridden by the AI class
     def start(self):
         pass
@@ -38,16 +48,14 @@ class BaseAI:
         pass
 
     # intended to be overridden by the AI class
+    #   errors are left to whoever gave the order, so a hosted session can fail on its own instead of taking the process down
     def _do_order(self, order, arguments):
-        callback = getattr(self, camel_case_converter(order))
-
-        if callback != None:
-            try:
-                return callback(*arguments)
-            except:
-                error_code.handle_error(error_code.AI_ERRORED, sys.exc_info()[0], "AI caused exception while trying to execute order '{}'.".format(order))
-        else:
-            error_code.handle_error(error_code.REFLECTION_FAILED, message="AI has no function '' to respond with.".format(order))
+        callback = getattr(self, camel_case_converter(order), None)
+
+        if callback is None:
+            raise AttributeError("AI has no function '{}' to respond with.".format(order))
+
+        return callback(*arguments)
 
     # This is called when this AI sends some invalid command to the server. The message explaining why it is invaluid will be automatically printed to the screen via this function.
     #   You can manually inherit this method, but because the only data you get about the invalid event is a human readable message, printing it to the terminal should be enough to not expose it to all except the curious.
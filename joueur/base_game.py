@@ -14,3 +14,7 @@ class BaseGame(DeltaMergeable):
         if id in self.game_objects:
             return self.game_objects[id]
 
+    # intended to be overridden by game classes that keep anything derived from their state
+    #   called with the ChangeJournal of every delta merged into the game, before any AI hears of it
+    def _delta_applied(self, journal):
+        pass
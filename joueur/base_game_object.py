@@ -2,5 +2,7 @@ from joueur.delta_mergeable import DeltaMergeable
 
 # @class BaseGameObject: the base class that every game object within a game inherit from for Python manipulation that would be redundant via Creer
 class BaseGameObject(DeltaMergeable):
+    __slots__ = ()
+
     def __init__(self):
         DeltaMergeable.__init__(self)
@@ -0,0 +1,42 @@
+# @class ChangeJournal: what merging one delta did to the game, so AIs can update what they track instead of rebuilding it
+#   changes and resizes are plain tuples, as a delta can make hundreds of them
+class ChangeJournal():
+    def __init__(self):
+        self.created = [] # game objects the delta created, their fields aren't in changes
+        self.changes = [] # (obj, field, old, new) for every field (snake_case) of an existing game (object) the delta changed. For lists and dicts, merged into in place, old and new are the same container
+        self.resizes = [] # (obj, field, old, new) lengths of every list field the delta changed the length of
+        self._by_field = None
+
+    def __bool__(self):
+        return bool(self.created or self.changes or self.resizes)
+
+    def of(self, field):
+        """ the changes to the field (snake_case, e.g. "turns_busy") of any game (object)
+
+        Returns:
+            list of (obj, field, old, new), empty if none changed it
+        """
+        if self._by_field is None:
+            self._by_field = {}
+            for change in self.changes:
+                self._by_field.setdefault(change[1], []).append(change)
+        return self._by_field.get(field, [])
+
+    def changed(self, cls, *fields):
+        """ the game objects of the class (e.g. Bottle) this delta created, or changed any of the fields of, in order
+
+        Returns:
+            list of the game objects
+        """
+        seen = set()
+        found = []
+        for obj in self.created:
+            if isinstance(obj, cls) and obj not in seen:
+                seen.add(obj)
+                found.append(obj)
+        for field in fields:
+            for obj, _, _, _ in self.of(field):
+                if isinstance(obj, cls) and obj not in seen:
+                    seen.add(obj)
+                    found.append(obj)
+        return found
@@ -1,182 +1,538 @@
 import socket, errno
+import selectors
+import signal
 import sys
 import os
-import json
+import re
 import time
+from collections import deque, namedtuple
 from joueur.serializer import serialize, deserialize
+import joueur.codec as codec
+import joueur.telemetry as telemetry
 import joueur.error_code as error_code
 from joueur.game_manager import GameManager
+from joueur.recorder import Recorder
+from joueur.json_stream import JsonStream
 import joueur.ansi_color_coder as color
 
 EOT_CHAR = chr(4)
+EOT_BYTE = EOT_CHAR.encode('utf-8')
+INITIAL_BUFFER_SIZE = 4096
+MAX_IDLE_BUFFER_SIZE = 1 << 20 # once drained, buffers grown past this (by huge frames) shrink back to the initial size
 
-# Client: A singlton module that talks to the server receiving game information and sending commands to execute. Clients perform no game logic
-class _Client:
+# only a frame whose event comes before its data can be streamed, though scalars (e.g. its epoch) can be between them
+_delta_prefix = re.compile(rb'\s*\{\s*"event"\s*:\s*"delta"\s*,(?:\s*"(?!data")[^"]*"\s*:[^{\[,"]*,)*\s*"data"\s*:')
+
+# the data of a delta event left as its frame, for GameManager.apply_delta_stream to read from start once the event is handled
+StreamedDelta = namedtuple('StreamedDelta', 'frame start'.split())
+
+# Client: talks to the server for one game session, receiving game information and sending commands to execute. Clients perform no game logic
+#   The module level functions below drive the one Client a normal run plays with. A host (see joueur.host) plays many Clients at once in one process,
+#   so those are made with exit_process=False: ending or failing tears down only that Client's session, raising error_code.SessionError instead of exiting.
+class Client():
     socket = None
+    transport = None
+    deadline = None # a time.perf_counter() time, past which waiting on the server fails with SERVER_TIMEOUT
+    order_times = None # a telemetry.Histogram to record how long the AI took on each order in
+    _recorder = None
+
+    def __init__(self, exit_process=True):
+        self.exit_process = exit_process
+        self.game = None
+        self.ai = None
+        self.manager = None
+        self.over = False
+        self.result = None # once the game is over: whether we won, why, and the server's closing message
+
+    def connect(self, server='localhost', port=3000, print_io=False, pipelined=False, record_path=None, stream_deltas=None):
+        self.server = server
+        self.port = int(port)
+        self._recorder = Recorder(record_path) if record_path else None
+        self._stream_deltas = stream_deltas # delta frames at least this many bytes are merged from their json as it is read, None for never
+
+        self._print_io = print_io
+        self._pipelined = pipelined
+        self._pending_runs = deque() # RunFutures waiting on their "ran" event, in the order they were sent
+        self._received_buffer = bytearray(INITIAL_BUFFER_SIZE) # preallocated, recv_into fills it from _received_length onwards
+        self._received_length = 0
+        self._scanned_length = 0 # how much of the received bytes are known to not contain an EOT_BYTE
+        self._events_stack = []
+        self._send_buffer = bytearray() # every event sent in one dispatch cycle, written in one go before waiting on the server again
+        self._woke_at = None
+        self._wake_latency_count = 0
+        self._wake_latency_total = 0.0
+        self._wake_latency_max = 0.0
+
+        print(color.text("cyan") + "Connecting to:", self.server + ":" + str(self.port) + color.reset())
+
+        # the selector blocks until the socket is readable, the wakeup socket lets signals (e.g. keyboard) and other threads break that wait
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ)
+        try:
+            signal.set_wakeup_fd(self._wakeup_writer.fileno())
+        except ValueError:
+            pass # not the main thread, so signals are never delivered here anyways
+
+        try:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # stupid Windows
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # sends are already coalesced, so don't let Nagle hold them back
+            self.socket.connect((self.server, self.port))
+        except socket.error as e:
+            self.handle_error(error_code.COULD_NOT_CONNECT, e, "Could not connect to " + self.server + ":" + str(self.port))
+
+        self._selector.register(self.socket, selectors.EVENT_READ)
+
+    def setup(self, game, ai, manager):
+        self.game = game
+        self.ai = ai
+        self.manager = manager
+        manager.set_client(self) # so its game objects send their commands through this session
+
+    ## reports the error, then exits the process, or for a hosted session disconnects just it and raises error_code.SessionError
+    def handle_error(self, code, e=None, message=None):
+        if self.exit_process:
+            self.disconnect()
+            error_code.handle_error(code, e, message)
+
+        handling = sys.exc_info()[1]
+        if isinstance(handling, (error_code.SessionError, SystemExit, KeyboardInterrupt)):
+            raise handling # e.g. a command in ai.start() already ended the session, so it was already reported
+        self.disconnect()
+        error_code.report_error(code, e, message)
+        raise error_code.SessionError(code, message)
+
+    def _send_raw(self, string):
+        if self._print_io:
+            print(color.text("magenta") + "TO SERVER --> " + str(string) + color.reset())
+        self._send_buffer += string
+
+    ## writes everything sent since the last flush with a single sendall
+    def flush(self):
+        if len(self._send_buffer) > 0:
+            try:
+                self.socket.sendall(self._send_buffer)
+            except socket.error as e:
+                self.handle_error(error_code.DISCONNECTED_UNEXPECTEDLY, e, "Error writing to socket")
+            if telemetry.enabled:
+                telemetry.count("bytes_out", len(self._send_buffer))
+                telemetry.count("writes")
+            del self._send_buffer[:]
+
+     ## sends the server an event via socket
+    def send(self, event, data):
+        if telemetry.enabled:
+            telemetry.count("frames_out")
+            telemetry.count("events_out." + event)
+
+        self._send_raw(
+            codec.dumps({
+                'sentTime': int(time.time()),
+                'event': event,
+                'data': serialize(data)
+            })
+            + EOT_BYTE
+        )
+
+    def disconnect(self, exit_code=None):
+        if self.socket:
+            try:
+                self.socket.sendall(self._send_buffer) # anything still buffered, e.g. the last "finished"
+            except socket.error:
+                pass # we are going away regardless
+            del self._send_buffer[:]
+            try:
+                previous_fd = signal.set_wakeup_fd(-1)
+                if previous_fd != self._wakeup_writer.fileno():
+                    signal.set_wakeup_fd(previous_fd) # someone else's, so put it back
+            except ValueError:
+                pass # not the main thread, so it was never set
+            self._selector.close()
+            self._wakeup_reader.close()
+            self._wakeup_writer.close()
+            self.socket.close()
+            self.socket = None
+
+        if self._recorder:
+            self._recorder.close()
+            self._recorder = None
+
+    ## wakes up a wait_for_events blocked on the socket, safe to call from other threads
+    def wakeup(self):
+        try:
+            self._wakeup_writer.send(b"\0")
+        except (BlockingIOError, socket.error):
+            pass # already has a pending wakeup, or is closed
+
+    ## the measured time between the selector reporting the socket readable and its events being dispatched
+    def wake_latency(self):
+        count = self._wake_latency_count
+        return {
+            'count': count,
+            'mean': self._wake_latency_total / count if count else 0.0,
+            'max': self._wake_latency_max
+        }
+
+    def _record_wake_latency(self):
+        latency = time.perf_counter() - self._woke_at
+        self._wake_latency_count += 1
+        self._wake_latency_total += latency
+        if latency > self._wake_latency_max:
+            self._wake_latency_max = latency
+        if telemetry.enabled:
+            telemetry.record("wake_to_dispatch", latency)
+
+    ## routes game object commands to another transport (e.g. a ReplayTransport) instead of this client's socket
+    def set_transport(self, transport):
+        self.transport = transport
+
+    def run_on_server(self, caller, function_name, args=None):
+        if self.transport:
+            return self.transport.run_on_server(caller, function_name, args)
+
+        sent_at = time.perf_counter() if telemetry.enabled else None
+        self.send("run", {
+            'caller': caller,
+            'functionName': function_name,
+            'args': args
+        })
 
-_client = _Client()
+        if self._pipelined:
+            future = RunFuture(self, (function_name, sent_at) if telemetry.enabled else None)
+            self._pending_runs.append(future)
+            return future
 
-def connect(server='localhost', port=3000, print_io=False):
-    _client.server = server
-    _client.port = int(port)
+        ran_data = self.wait_for_event("ran")
+        if telemetry.enabled:
+            telemetry.record("run." + function_name, time.perf_counter() - sent_at)
+        return deserialize(ran_data, self.game)
 
-    _client._print_io = print_io
-    _client._received_buffer = ""
-    _client._events_stack = []
-    _client._buffer_size = 1024
-    _client._timeout_time = 1.0
+    ## handles events until the given RunFuture's "ran" event has come back
+    def _wait_for_run(self, future):
+        while not future.done():
+            self.wait_for_events()
 
-    print(color.text("cyan") + "Connecting to:", _client.server + ":" + str(_client.port) + color.reset())
+            while len(self._events_stack) > 0 and not future.done():
+                sent = self._events_stack.pop()
+                self._record_wake_latency()
+                self._auto_handle(sent['event'], sent['data'] if 'data' in sent else None)
 
-    try:
-        _client.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        _client.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # stupid Windows
-        _client.socket.settimeout(_client._timeout_time) # so the blocking on recv doesn't hang forever and other system interupts (e.g. keyboard) can be handled
-        _client.socket.connect((_client.server, _client.port))
-    except socket.error as e:
-        error_code.handle_error(error_code.COULD_NOT_CONNECT, e, "Could not connect to " + _client.server + ":" + str(_client.port))
+    ## waits for every command still in flight, so nothing is pending past the end of an order
+    def _wait_for_pending_runs(self):
+        if len(self._pending_runs) > 0:
+            self._wait_for_run(self._pending_runs[-1])
 
-def setup(game, ai, manager):
-    _client.game = game
-    _client.ai = ai
-    _client.manager = manager
+    ## handles events until the game is over
+    def play(self):
+        self.wait_for_event(None)
 
-def _send_raw(string):
-    if _client._print_io:
-        print(color.text("magenta") + "TO SERVER --> " + str(string) + color.reset())
-    _client.socket.send(string)
+    def wait_for_event(self, event):
+        while True:
+            self.wait_for_events()
+
+            while len(self._events_stack) > 0:
+                sent = self._events_stack.pop()
+                self._record_wake_latency()
+                data = sent['data'] if 'data' in sent else None
+                if event != None and sent['event'] == event:
+                    return data
+                else:
+                    self._auto_handle(sent['event'], data)
+                    if self.over:
+                        return None
+
+    ## loops to check the socket for incoming data and ends once some events get found
+    def wait_for_events(self):
+        if len(self._events_stack) > 0:
+            return # as we already have events to handle, no need to wait for more
+
+        try:
+            while True:
+                if not self.socket:
+                    self.handle_error(error_code.DISCONNECTED_UNEXPECTEDLY, message="Socket closed while waiting for events")
+
+                self.flush() # about to block on the server, so it needs everything we have sent
+
+                timeout = None
+                if self.deadline is not None:
+                    timeout = self.deadline - time.perf_counter()
+                    if timeout <= 0:
+                        self.handle_error(error_code.SERVER_TIMEOUT, message="Game went past its deadline while waiting for events")
+
+                readable = False
+                for key, mask in self._selector.select(timeout): # blocks until the server sends us something, we get woken up, or the deadline
+                    if key.fileobj is self._wakeup_reader:
+                        self._drain_wakeup()
+                    else:
+                        readable = True
+
+                if not readable:
+                    continue
+
+                self._woke_at = time.perf_counter()
+                received = 0
+                try:
+                    received = self._receive_into_buffer()
+                except socket.error as e:
+                    self.handle_error(error_code.CANNOT_READ_SOCKET, e, "Error reading socket while waiting for events")
+
+                if not received:
+                    self.handle_error(error_code.DISCONNECTED_UNEXPECTEDLY, message="Server closed the connection while waiting for events")
+                if telemetry.enabled:
+                    telemetry.count("bytes_in", received)
+                    telemetry.count("reads")
+                if self._print_io:
+                    start = self._received_length - received
+                    print(color.text("magenta") + "FROM SERVER <-- " + self._received_buffer[start:self._received_length].decode("utf-8", "replace") + color.reset())
+
+                if self._recorder:
+                    parsed_frames = [self._parse_frame(self._record_frame(frame)) for frame in self._split_frames()]
+                else:
+                    parsed_frames = [self._parse_frame(frame) for frame in self._split_frames()]
+                for parsed in reversed(parsed_frames):
+                    self._events_stack.append(parsed)
+
+                if len(self._events_stack) > 0:
+                    return
+        except (KeyboardInterrupt, SystemExit):
+            self.disconnect()
+
+    ## reads whatever is on the socket straight into the end of the received buffer, growing it when full
+    def _receive_into_buffer(self):
+        buffer = self._received_buffer
+        if self._received_length == len(buffer):
+            buffer.extend(bytes(len(buffer))) # full, so double it. Frames larger than the buffer only cost log(n) grows
+
+        with memoryview(buffer) as view, view[self._received_length:] as free:
+            received = self.socket.recv_into(free)
+
+        self._received_length += received
+        return received
+
+    ## yields every complete frame in the received buffer, then moves the trailing partial frame to the front
+    def _split_frames(self):
+        buffer = self._received_buffer
+        length = self._received_length
+        start = 0
+        eot = buffer.find(EOT_BYTE, self._scanned_length, length)
+        while eot != -1:
+            yield buffer[start:eot]
+            start = eot + 1
+            eot = buffer.find(EOT_BYTE, start, length)
+
+        if start > 0:
+            length -= start
+            buffer[:length] = buffer[start:start + length]
+            if length == 0 and len(buffer) > MAX_IDLE_BUFFER_SIZE:
+                del buffer[INITIAL_BUFFER_SIZE:]
+
+        self._received_length = length
+        self._scanned_length = length # the partial frame left over has no EOT_BYTE, so don't scan it again
+
+    def _record_frame(self, frame):
+        self._recorder.write(frame, time.time())
+        return frame
+
+    def _parse_frame(self, frame):
+        if self._stream_deltas is not None and len(frame) >= self._stream_deltas:
+            match = _delta_prefix.match(frame)
+            if match: # parsed as it is merged instead
+                if telemetry.enabled:
+                    telemetry.count("frames_in")
+                    telemetry.count("events_in.delta")
+                return {'event': "delta", 'data': StreamedDelta(frame, match.end())}
+
+        if telemetry.enabled:
+            started = time.perf_counter()
+
+        try:
+            parsed = codec.loads(frame)
+        except ValueError as e:
+            self.handle_error(error_code.MALFORMED_JSON, e, "Could not parse json '" + frame.decode("utf-8", "replace") + "'")
+
+        if telemetry.enabled:
+            telemetry.record("json_parse", time.perf_counter() - started)
+            telemetry.count("frames_in")
+            telemetry.count("events_in." + parsed['event'])
+        return parsed
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_reader.recv(1024):
+                pass
+        except (BlockingIOError, socket.error):
+            pass
 
- ## sends the server an event via socket
-def send(event, data):
-    _send_raw(
-        (json.dumps({
-            'sentTime': int(time.time()),
-            'event': event,
-            'data': serialize(data)
+    ## called via the client run loop when data is sent
+    def _auto_handle(self, event, data=None):
+        auto_handle_function = getattr(self, "_auto_handle_" + event, None)
+
+        if auto_handle_function:
+            return auto_handle_function(data)
+        else:
+            self.handle_error(error_code.UNKNOWN_EVENT_FROM_SERVER, message=("Could not auto handle event '" + event + "'."))
+
+    def _auto_handle_delta(self, data):
+        if telemetry.enabled:
+            started = time.perf_counter()
+
+        try:
+            if type(data) is StreamedDelta:
+                journal = self.manager.apply_delta_stream(JsonStream(data.frame.decode("utf-8"), data.start))
+            else:
+                journal = self.manager.apply_delta_state(data)
+        except:
+            self.handle_error(error_code.DELTA_MERGE_FAILURE, sys.exc_info(), "Error merging delta")
+
+        if telemetry.enabled:
+            telemetry.record("delta_merge", time.perf_counter() - started)
+
+        if self.ai.player: # then the AI is ready for updates
+            self.ai.set_changes(journal)
+            self.ai.game_updated()
+
+    def _auto_handle_order(self, data):
+        if telemetry.enabled or self.order_times is not None:
+            started = time.perf_counter()
+
+        args = deserialize(data['args'], self.game)
+        try:
+            returned = self.ai._do_order(data['name'], args)
+        except:
+            self.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored executing order '" + data['name'] + "'.")
+
+        self._wait_for_pending_runs()
+
+        if telemetry.enabled:
+            telemetry.record("order." + data['name'], time.perf_counter() - started)
+        if self.order_times is not None:
+            self.order_times.record(time.perf_counter() - started)
+
+        self.send("finished", {
+            'orderIndex': data['index'],
+            'returned': returned
         })
-        + EOT_CHAR).encode('utf-8')
-    )
 
-def disconnect(exit_code=None):
-    if _client.socket:
-        _client.socket.close()
+    def _auto_handle_ran(self, data):
+        if len(self._pending_runs) == 0:
+            self.handle_error(error_code.UNKNOWN_EVENT_FROM_SERVER, message="Got a 'ran' event with no command waiting on it.")
 
-def run_on_server(caller, function_name, args=None):
-    send("run", {
-        'caller': caller,
-        'functionName': function_name,
-        'args': args
-    })
+        future = self._pending_runs.popleft()
+        future._resolve(deserialize(data, self.game))
 
-    ran_data = wait_for_event("ran")
-    return deserialize(ran_data, _client.game)
+        if future._sent:
+            function_name, sent_at = future._sent
+            telemetry.record("run." + function_name, time.perf_counter() - sent_at)
 
-def play():
-    wait_for_event(None)
+    def _auto_handle_invalid(self, data):
+        try:
+            self.ai.invalid(data['message'])
+        except:
+            self.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored while handling invalid data.")
 
-def wait_for_event(event):
-    while True:
-        wait_for_events()
-
-        while len(_client._events_stack) > 0:
-            sent = _client._events_stack.pop()
-            data = sent['data'] if 'data' in sent else None
-            if event != None and sent['event'] == event:
-                return data
-            else:
-                _auto_handle(sent['event'], data)
+    def _auto_handle_fatal(self, data):
+        self.handle_error(error_code.FATAL_EVENT, message="Got a fatal event from the server: " + data['message'])
 
-## loops to check the socket for incoming data and ends once some events get found
-def wait_for_events():
-    if len(_client._events_stack) > 0:
-        return # as we already have events to handle, no need to wait for more
+    def _auto_handle_over(self, data):
+        won = self.ai.player.won
+        reason = self.ai.player.reason_won if self.ai.player.won else self.ai.player.reason_lost
+        self.result = {
+            'won': won,
+            'reason': reason,
+            'score': getattr(self.ai.player, 'score', None), # not every game scores its players
+            'message': data['message'] if 'message' in data else None
+        }
 
-    try:
-        while True:
-            sent = None
-            try:
-                sent = _client.socket.recv(_client._buffer_size).decode("utf-8")
-            except socket.timeout:
-                pass # timed out so keyboard/system interupts can be handled, hence the while true loop above
-            except socket.error as e:
-                error_code.handle_error(error_code.CANNOT_READ_SOCKET, e, "Error reading socket while waiting for events")
+        print(color.text("green") + "Game is over.", "I Won!" if won else "I Lost :(", "because: " + reason + color.reset())
 
-            if not sent:
-                continue
-            elif _client._print_io:
-                print(color.text("magenta") + "FROM SERVER <-- " + str(sent) + color.reset())
+        try:
+            self.ai.end(won, reason)
+        except:
+            self.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored during end.")
 
-            split = (_client._received_buffer + sent).split(EOT_CHAR)
-            _client._received_buffer = split.pop() # the last item will either be "" if the last char was an EOT_CHAR, or a partial data we need to buffer anyways
+        if 'message' in data:
+            print(color.text("cyan") + data['message'] + color.reset())
 
-            for json_str in reversed(split):
-                try:
-                    parsed = json.loads(json_str)
-                except ValueError as e:
-                    error_code.handle_error(error_code.MALFORMED_JSON, e, "Could not parse json '" + json_str + "'")
+        self.disconnect()
+        self.over = True
 
-                _client._events_stack.append(parsed)
+        if self.exit_process:
+            if telemetry.enabled:
+                print(color.text("cyan") + telemetry.summary() + color.reset())
+            os._exit(0)
 
-            if len(_client._events_stack) > 0:
-                return
-    except (KeyboardInterrupt, SystemExit):
-        disconnect()
+# RunFuture: the eventual result of a command run on the server while pipelined. Reading it (result(), truthiness, or its attributes) only waits for its own "ran" event
+class RunFuture():
+    __slots__ = ('_client', '_done', '_value', '_sent')
 
-    ## called via the client run loop when data is sent
-def _auto_handle(event, data=None):
-    g = globals() # the current module, e.g. the Client module that acts as a singleton
-    auto_handle_function = g["_auto_handle_" + event]
-
-    if auto_handle_function:
-        return auto_handle_function(data)
-    else:
-        error_code.handle_error(error_code.UNKNOWN_EVENT_FROM_SERVER, message=("Could not auto handle event '" + event + "'."))
-
-def _auto_handle_delta(data):
-    try:
-        _client.manager.apply_delta_state(data)
-    except:
-        error_code.handle_error(error_code.DELTA_MERGE_FAILURE, sys.exc_info(), "Error merging delta")
-
-    if _client.ai.player: # then the AI is ready for updates
-        _client.ai.game_updated()
-
-def _auto_handle_order(data):
-    args = deserialize(data['args'], _client.game)
-    try:
-        returned = _client.ai._do_order(data['name'], args)
-    except:
-        print("esc info", type(sys.exc_info()))
-        error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored executing order '" + data['name'] + "'.")
-
-    send("finished", {
-        'orderIndex': data['index'],
-        'returned': returned
-    })
-
-def _auto_handle_invalid(data):
-    try:
-        _client.ai.invalid(data['message'])
-    except:
-        error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored while handling invalid data.")
-
-def _auto_handle_fatal(data):
-    error_code.handle_error(error_code.FATAL_EVENT, message="Got a fatal event from the server: " + data['message'])
-
-def _auto_handle_over(data):
-    won = _client.ai.player.won
-    reason = _client.ai.player.reason_won if _client.ai.player.won else _client.ai.player.reason_lost
-
-    print(color.text("green") + "Game is over.", "I Won!" if won else "I Lost :(", "because: " + reason + color.reset())
-
-    try:
-        _client.ai.end(won, reason)
-    except:
-        error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(), "AI errored during end.")
-
-    if 'message' in data:
-        print(color.text("cyan") + data['message'] + color.reset())
-
-    disconnect()
-    os._exit(0)
+    def __init__(self, client, sent=None):
+        object.__setattr__(self, '_client', client)
+        object.__setattr__(self, '_done', False)
+        object.__setattr__(self, '_value', None)
+        object.__setattr__(self, '_sent', sent) # (function name, when it was sent) when telemetry is timing it
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        if not self._done:
+            self._client._wait_for_run(self)
+        return self._value
+
+    def _resolve(self, value):
+        object.__setattr__(self, '_value', value)
+        object.__setattr__(self, '_done', True)
+
+    def __bool__(self):
+        return bool(self.result())
+
+    def __getattr__(self, name):
+        return getattr(self.result(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.result(), name, value)
+
+# the Client this module's functions drive, for the one game a process plays when run normally. Game objects with no session of their own send commands through it
+_client = Client()
+
+def connect(server='localhost', port=3000, print_io=False, pipelined=False, record_path=None, stream_deltas=None):
+    _client.connect(server, port, print_io, pipelined, record_path, stream_deltas)
+
+def setup(game, ai, manager):
+    _client.setup(game, ai, manager)
+
+def handle_error(code, e=None, message=None):
+    _client.handle_error(code, e, message)
 
+def flush():
+    _client.flush()
+
+def send(event, data):
+    _client.send(event, data)
+
+def disconnect(exit_code=None):
+    _client.disconnect(exit_code)
+
+def wakeup():
+    _client.wakeup()
+
+def wake_latency():
+    return _client.wake_latency()
+
+def set_transport(transport):
+    _client.set_transport(transport)
+
+def run_on_server(caller, function_name, args=None):
+    return _client.run_on_server(caller, function_name, args)
+
+def play():
+    _client.play()
+
+def wait_for_event(event):
+    return _client.wait_for_event(event)
+
+def wait_for_events():
+    _client.wait_for_events()
@@ -0,0 +1,61 @@
+# Codec: encodes and decodes the json sent through the socket, as bytes end to end.
+#   Uses orjson or ujson when they can be imported, falling back to the standard library's json.
+import json
+
+def _json_dumps(obj):
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _json_loads(data):
+    return json.loads(data)
+
+_codecs = {
+    'json': (_json_dumps, _json_loads)
+}
+
+try:
+    import orjson
+
+    def _orjson_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    _codecs['orjson'] = (_orjson_dumps, orjson.loads)
+except ImportError:
+    pass
+
+try:
+    import ujson
+
+    def _ujson_dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def _ujson_loads(data):
+        return ujson.loads(data if isinstance(data, bytes) else bytes(data)) # only takes str or bytes, and frames can be bytearrays
+
+    _codecs['ujson'] = (_ujson_dumps, _ujson_loads)
+except ImportError:
+    pass
+
+_preferred = ['orjson', 'ujson', 'json'] # fastest first
+
+name = None
+dumps = None
+loads = None
+
+## the names of the codecs that can be used, fastest first
+def available():
+    return [codec_name for codec_name in _preferred if codec_name in _codecs]
+
+## switches the module's dumps/loads to the given codec, 'auto' picks the fastest one available. Returns the name of the one used
+def use(codec_name='auto'):
+    global name, dumps, loads
+
+    if codec_name == 'auto':
+        codec_name = available()[0]
+    elif codec_name not in _codecs:
+        raise ValueError("Codec '{}' is not available, can use: {}.".format(codec_name, ", ".join(available())))
+
+    name = codec_name
+    dumps, loads = _codecs[codec_name]
+    return name
+
+use()
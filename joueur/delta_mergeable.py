@@ -1,12 +1,17 @@
 class DeltaMergeable():
     """a game or game object that needs to be delta merged"""
 
+    __slots__ = ('_client',) # game objects are slotted all the way down, games keep a __dict__
+
     def __init__(self):
-        pass
+        self._client = None # the session to send commands through, set by its GameManager
 
     def _run_on_server(self, function_name, **kwargs):
-        import joueur.client # avoid circular imports (sphinx won't build docs otherwise)
-        return joueur.client.run_on_server(self, function_name, kwargs)
+        client = self._client
+        if client is None:
+            import joueur.client # avoid circular imports (sphinx won't build docs otherwise)
+            client = joueur.client
+        return client.run_on_server(self, function_name, kwargs)
 
     def __contains__(self, key):
         return hasattr(self, key)
@@ -26,14 +26,21 @@ import sys
 import joueur.ansi_color_coder as color
 import os
 
-def handle_error(error_code, e=None, message=None):
-    if isinstance(e, SystemExit) or isinstance(e, KeyboardInterrupt): # we accidentally caught an exit exception, just re-throw it till it gets to the end of the runtime stack
-        sys.exit(e.code)
+## the name of an error code, e.g. "AI_ERRORED" for 42
+def name_of(error_code):
+    return _by_code[error_code] if error_code in _by_code else "UNKNOWN ERROR {}".format(error_code)
 
-    import joueur.client # avoid circular imports (sphinx won't build docs otherwise)
-    joueur.client.disconnect()
+# SessionError: raised instead of exiting the process when a session hosted with others (see joueur.host) errors, so only that session ends
+#   Like SystemExit it is a BaseException, so an AI's `except Exception` can't swallow it and carry on with a closed session
+class SessionError(BaseException):
+    def __init__(self, error_code, message=None):
+        BaseException.__init__(self, message or name_of(error_code))
+        self.code = error_code
+        self.message = message
 
-    sys.stderr.write(color.text("red") + "---\nError: {}\n---".format(_by_code[error_code] if error_code in _by_code else "UNKNOWN ERROR {}".format(error_code)))
+## writes the error, and the exception being handled if any, to stderr
+def report_error(error_code, e=None, message=None):
+    sys.stderr.write(color.text("red") + "---\nError: {}\n---".format(name_of(error_code)))
 
     if message:
         sys.stderr.write("\n{}\n---".format(message))
@@ -46,4 +53,13 @@ def handle_error(error_code, e=None, message=None):
         sys.stderr.write("---")
 
     sys.stderr.write("\n" + color.reset())
+
+def handle_error(error_code, e=None, message=None):
+    if isinstance(e, SystemExit) or isinstance(e, KeyboardInterrupt): # we accidentally caught an exit exception, just re-throw it till it gets to the end of the runtime stack
+        sys.exit(e.code)
+
+    import joueur.client # avoid circular imports (sphinx won't build docs otherwise)
+    joueur.client.disconnect()
+
+    report_error(error_code, e, message)
     os._exit(error_code)
@@ -1,31 +1,268 @@
 from joueur.delta_mergeable import DeltaMergeable
 from joueur.base_game_object import BaseGameObject
 from joueur.utilities import camel_case_converter
-from joueur.serializer import is_game_object_reference, is_object
+from joueur.change_journal import ChangeJournal
+from joueur.serializer import is_game_object_reference
+
+# how a field of a game (object) is merged, by what its default value is
+SCALAR = 1 # set as is
+REFERENCE = 2 # None by default, set to the game object a {'id': ...} refers to
+LIST = 3 # merged into in place, resized to its &LEN
+DICT = 4 # merged into in place
+
+_attribute_names = {} # wire key (e.g. "turnsBusy") to its attribute (e.g. "_turns_busy"), for keys no applier knows
+
+def _attribute_name(key):
+    name = _attribute_names.get(key)
+    if name is None:
+        name = _attribute_names[key] = "_" + camel_case_converter(key)
+    return name
+
+def _wire_key(name):
+    """ the camelCase key the server sends for a snake_case property name, e.g. "tileEast" for "tile_east" """
+    words = name.split("_")
+    return words[0] + "".join(word.capitalize() for word in words[1:])
+
+## the applier of a game (object) class: its wire keys mapped to how to merge them, the attribute to merge them into, and its field name for journals
+def compile_applier(cls):
+    prototype = cls() # its __init__ gives every backing attribute its default
+    fields = {}
+    for klass in reversed(cls.__mro__):
+        for name, member in vars(klass).items():
+            if not isinstance(member, property):
+                continue
+            attribute = "_" + name
+            if not hasattr(prototype, attribute):
+                continue # computed, not backed by an attribute the server sets
+            key = _wire_key(name)
+            if camel_case_converter(key) != name:
+                continue # doesn't round trip, so the generic path handles it as it always has
+            default = getattr(prototype, attribute)
+            if default is None:
+                kind = REFERENCE
+            elif isinstance(default, list):
+                kind = LIST
+            elif isinstance(default, dict):
+                kind = DICT
+            else:
+                kind = SCALAR
+            fields[key] = (kind, attribute, name)
+    return fields
 
 # @class GameManager: managed the game and it's game objects including unserializing deltas
 class GameManager():
     def __init__(self, game):
         self.game = game
         self._game_object_classes = game._game_object_classes
+        self.client = None
+        self._unresolved = None # while a delta is streamed, the references it made to game objects it hadn't created yet
+
+        # compiled once, so merging a delta never has to work out what a key means
+        self._appliers = {cls: compile_applier(cls) for cls in self._game_object_classes.values()}
+        self._appliers[type(game)] = compile_applier(type(game))
+
+    ## the client (session) the game and its game objects send their commands through, None for the joueur.client module's
+    def set_client(self, client):
+        self.client = client
+        self.game._client = client
+        for game_object in self.game._game_objects.values():
+            game_object._client = client
 
     def set_constants(self, constants):
         self._server_constants = constants
         self._DELTA_REMOVED = constants['DELTA_REMOVED']
         self._DELTA_LIST_LENGTH = constants['DELTA_LIST_LENGTH']
 
-    ## applies a delta state (change in state information) to this game
+    ## applies a delta state (change in state information) to this game. The delta is only read, never changed
+    #   returns the ChangeJournal of what it changed, which the game is also told about
     def apply_delta_state(self, delta):
+        journal = ChangeJournal()
         if 'gameObjects' in delta:
-            self._init_game_objects(delta['gameObjects'])
+            journal.created = self._init_game_objects(delta['gameObjects'])
+
+        self._apply(self.game, delta, journal)
+        self.game._delta_applied(journal)
+        return journal
 
-        self._merge_delta(self.game, delta)
+    ## applies a delta read straight from a JsonStream (see joueur.json_stream) positioned at it, without decoding it whole
+    #   the game's fields and lists, and each game object's delta, are merged as they are read, so only one of them is ever decoded at once.
+    #   References to game objects the delta creates further on are fixed up once it has all been read. Returns the ChangeJournal, as apply_delta_state
+    def apply_delta_stream(self, stream):
+        if not stream.enter():
+            raise ValueError("Expected a delta to stream at {}".format(stream.pos))
+
+        journal = ChangeJournal()
+        unresolved = self._unresolved = []
+        try:
+            self._stream_members(self.game, stream, journal)
+        finally:
+            self._unresolved = None
+
+        game_objects = self.game._game_objects
+        for state, key, id, name in unresolved:
+            game_object = game_objects.get(id)
+            if isinstance(key, int):
+                if key < len(state):
+                    state[key] = game_object
+            else:
+                setattr(state, key, game_object)
+                if name:
+                    journal.changes.append((state, name, None, game_object))
+
+        self.game._delta_applied(journal)
+        return journal
+
+    ## merges the members of the game's delta from the stream, streaming its lists and game objects instead of decoding them
+    def _stream_members(self, state, stream, journal):
+        fields = self._appliers[type(state)]
+        key = stream.key()
+        while key is not None:
+            field = fields.get(key)
+            if key == 'gameObjects' and stream.enter():
+                self._stream_game_objects(stream, journal)
+            elif field is not None and field[0] == LIST and stream.enter():
+                current = getattr(state, field[1])
+                length = len(current)
+                self._merge_list_items(current, stream.members(), False)
+                journal.changes.append((state, field[2], current, current))
+                if len(current) != length:
+                    journal.resizes.append((state, field[2], length, len(current)))
+            else:
+                self._apply(state, {key: stream.value()}, journal)
+            key = stream.key()
+
+    ## creates or merges each game object in the gameObjects of the delta being streamed, decoding one game object's delta at a time
+    def _stream_game_objects(self, stream, journal):
+        game_objects = self.game._game_objects
+        for id, object_delta in stream.members():
+            game_object = game_objects.get(id)
+            if game_object is None:
+                game_object = self._game_object_classes[object_delta['gameObjectName']]()
+                game_object._client = self.client
+                game_objects[id] = game_object
+                journal.created.append(game_object)
+                self._apply(game_object, object_delta, None)
+            else:
+                self._apply(game_object, object_delta, journal)
 
     ## game objects can be refences in the delta states for cycles, they will all point to the game objects here.
+    #   returns the game objects it created
     def _init_game_objects(self, delta_game_objects):
+        created = []
         for id, obj in delta_game_objects.items():
             if not id in self.game._game_objects: # then we need to create it
-                self.game._game_objects[id] = self._game_object_classes[obj['gameObjectName']]()
+                game_object = self._game_object_classes[obj['gameObjectName']]()
+                game_object._client = self.client
+                self.game._game_objects[id] = game_object
+                created.append(game_object)
+        return created
+
+    ## merges a delta into a game (object) via its class's applier, noting what it changed in journal (unless None, for objects just created)
+    def _apply(self, state, delta, journal):
+        fields = self._appliers.get(type(state))
+        if fields is None:
+            fields = self._appliers[type(state)] = compile_applier(type(state))
+        game_objects = self.game._game_objects
+        removed = self._DELTA_REMOVED
+        record = journal.changes.append if journal is not None else None
+
+        for key, d in delta.items():
+            field = fields.get(key)
+            if field is None: # not a known field, merge it the generic way
+                attribute = _attribute_name(key)
+                if not hasattr(type(state), attribute) and not hasattr(state, '__dict__'):
+                    continue # slotted, and without a property for it, so there is nothing an AI could read it through
+                old = getattr(state, attribute, None)
+                self._merge_member(state, attribute, d)
+                if record:
+                    record((state, attribute[1:], old, getattr(state, attribute, None)))
+                continue
+
+            kind, attribute, name = field
+            if kind == SCALAR:
+                if record:
+                    old = getattr(state, attribute)
+                    if old != d:
+                        record((state, name, old, d))
+                setattr(state, attribute, d)
+            elif kind == REFERENCE:
+                if type(d) is dict and len(d) == 1 and 'id' in d:
+                    id = d['id']
+                    d = game_objects.get(id)
+                    if d is None and self._unresolved is not None: # streamed before the game object it refers to
+                        self._unresolved.append((state, attribute, id, record and name))
+                # else None, or a value the server sent where a reference usually is
+                if record:
+                    old = getattr(state, attribute)
+                    if old is not d:
+                        record((state, name, old, d))
+                setattr(state, attribute, d)
+            elif d == removed:
+                pass # an object's fields are never removed
+            elif kind == LIST and type(d) is dict:
+                current = getattr(state, attribute)
+                length = len(current)
+                self._merge_list(current, d)
+                if record:
+                    record((state, name, current, current))
+                    if len(current) != length:
+                        journal.resizes.append((state, name, length, len(current)))
+            elif kind == DICT and type(d) is dict:
+                if attribute == "_game_objects":
+                    created = set(journal.created) if journal is not None else ()
+                    for id, object_delta in d.items():
+                        game_object = game_objects[id]
+                        self._apply(game_object, object_delta, None if game_object in created else journal)
+                else:
+                    current = getattr(state, attribute)
+                    self._merge_delta(current, d)
+                    if record:
+                        record((state, name, current, current))
+            else:
+                if record:
+                    record((state, name, getattr(state, attribute), d))
+                setattr(state, attribute, d)
+
+    ## merges a list delta (a dict of index strings, plus its &LEN) into a list
+    def _merge_list(self, state, delta):
+        if self._DELTA_LIST_LENGTH in delta:
+            self._resize(state, delta[self._DELTA_LIST_LENGTH])
+            self._merge_list_items(state, delta.items(), True)
+        else:
+            self._merge_list_items(state, delta.items(), False)
+
+    def _resize(self, state, length):
+        if len(state) > length:
+            del state[length:]
+        elif len(state) < length:
+            state.extend([None] * (length - len(state)))
+
+    ## merges the (index string, value) items of a list delta into a list, resizing it at its &LEN unless it already was
+    def _merge_list_items(self, state, items, resized):
+        length_key = self._DELTA_LIST_LENGTH
+        removed = self._DELTA_REMOVED
+        game_objects = self.game._game_objects
+        for key, d in items:
+            if key == length_key:
+                if not resized:
+                    self._resize(state, d)
+                continue
+            index = int(key)
+            if d == removed:
+                if index < len(state):
+                    del state[index]
+                continue
+            if index >= len(state): # a streamed list's &LEN can come after its items
+                self._resize(state, index + 1)
+            if type(d) is dict:
+                if len(d) == 1 and 'id' in d:
+                    state[index] = game_objects.get(d['id'])
+                    if state[index] is None and self._unresolved is not None: # streamed before the game object it refers to
+                        self._unresolved.append((state, index, d['id'], None))
+                else:
+                    self._merge_member(state, index, d)
+            else:
+                state[index] = d
 
     ## Correctly apply a single change to a member of a list, dict, or object
     def _set_member(self, state, state_key, value):
@@ -34,43 +271,42 @@ class GameManager():
         else:
             setattr(state, state_key, value)
 
-    ## recursively merges delta changes to the game.
-    def _merge_delta(self, state, delta):
-        delta_length = -1
-        if self._DELTA_LIST_LENGTH in delta:
-            delta_length = delta[self._DELTA_LIST_LENGTH]
-            del delta[self._DELTA_LIST_LENGTH] # we don't want to copy this key/value over to the state, it was just to signify it is an array
-
-        if delta_length > -1: # then this part in the state is an array
-            while len(state) > delta_length: # remove elements off the array to make it's size correct.
-                state.pop()
-            while len(state) < delta_length: # append elements on the array to make it's size correct.
-                state.append(None)
-
-        for key in delta: # deltas will always be objects when iterating through, arrays just have keys of numbers
-            d = delta[key]
-            state_key = key # array's keys are real numbers, not strings e.g. "1"
-            key_in_state = False
-
-            if isinstance(state, list):
-                state_key = int(key)
-                key_in_state = state_key < len(state)
-            else:
-                if isinstance(state, DeltaMergeable):
-                    state_key = "_" + camel_case_converter(state_key)
-                key_in_state = state_key in state
+    ## merges one change to a member of a list, dict, or object, for anything the compiled appliers don't cover
+    def _merge_member(self, state, state_key, d):
+        if isinstance(state, list):
+            key_in_state = state_key < len(state)
+        elif isinstance(state, DeltaMergeable):
+            key_in_state = hasattr(state, state_key)
+        else:
+            key_in_state = state_key in state
 
-            if d == self._DELTA_REMOVED:
-                if key_in_state:
+        if d == self._DELTA_REMOVED:
+            if key_in_state:
+                if isinstance(state, DeltaMergeable):
+                    delattr(state, state_key)
+                else:
                     del state[state_key]
-            elif is_game_object_reference(d): # then this is a shallow reference to a game object
-                referenced_object = self.game.get_game_object(d['id'])
-                self._set_member(state, state_key, referenced_object)
-            elif is_object(d) and key_in_state and is_object(state[state_key]):
-                self._merge_delta(state[state_key], d)
-            elif not key_in_state and is_object(d):
-                if isinstance(d, dict):
-                    state[state_key] = [] if d in self._DELTA_LIST_LENGTH else {}
-                    self._merge_delta(state[state_key], d)
+        elif is_game_object_reference(d): # then this is a shallow reference to a game object
+            self._set_member(state, state_key, self.game.get_game_object(d['id']))
+        elif isinstance(d, dict):
+            current = (getattr(state, state_key) if isinstance(state, DeltaMergeable) else state[state_key]) if key_in_state else None
+            if isinstance(current, DeltaMergeable):
+                self._apply(current, d, None)
+            elif isinstance(current, list):
+                self._merge_list(current, d)
+            elif isinstance(current, dict):
+                self._merge_delta(current, d)
             else:
-                self._set_member(state, state_key, d)
+                current = [] if self._DELTA_LIST_LENGTH in d else {}
+                self._set_member(state, state_key, current)
+                if isinstance(current, list):
+                    self._merge_list(current, d)
+                else:
+                    self._merge_delta(current, d)
+        else:
+            self._set_member(state, state_key, d)
+
+    ## merges delta changes into a plain dict
+    def _merge_delta(self, state, delta):
+        for key, d in delta.items():
+            self._merge_member(state, key, d)
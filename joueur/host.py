@@ -0,0 +1,58 @@
+# Host: plays many games at once from one process, each in its own session with its own Client, Game, GameManager and AI.
+#   Sessions play on a thread pool, so they share one interpreter start up and one import of the game. A session that ends or fails only tears down its own socket.
+import copy
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import joueur.run
+import joueur.error_code as error_code
+import joueur.telemetry as telemetry
+import joueur.ansi_color_coder as color
+from joueur.client import Client
+
+## plays one game in its own session (a new Client unless given one), returning how it went. Never raises, a failed session is just a result with an error
+def play_session(args, index, client=None):
+    session_args = copy.copy(args)
+    if args.record:
+        session_args.record = "{}.{}".format(args.record, index) # one recording per session, they can't share a file
+
+    if client is None:
+        client = Client(exit_process=False)
+    try:
+        joueur.run.play_game(session_args, client)
+    except error_code.SessionError as e:
+        return {'session': index, 'error': error_code.name_of(e.code), 'code': e.code, 'message': e.message}
+    except Exception as e: # somewhere no session error handler covers, it still only ends this session
+        error_code.report_error(error_code.AI_ERRORED, e, "Session {} errored.".format(index))
+        return {'session': index, 'error': error_code.name_of(error_code.AI_ERRORED), 'code': error_code.AI_ERRORED, 'message': str(e)}
+    finally:
+        client.disconnect()
+
+    result = {'session': index}
+    result.update(client.result or {})
+    return result
+
+## plays args.sessions games at once, printing a summary and returning each session's result once they are all over
+def host(args):
+    joueur.run.prepare(args)
+
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        futures = [pool.submit(play_session, args, index) for index in range(args.sessions)]
+        try:
+            results = [future.result() for future in futures]
+        except KeyboardInterrupt:
+            os._exit(error_code.DISCONNECTED_UNEXPECTEDLY) # the sessions are blocked on their sockets, closing the process closes them all
+
+    errored = [result for result in results if 'error' in result]
+    won = sum(1 for result in results if result.get('won'))
+    print(color.text("cyan") + "Hosted {} sessions: {} won, {} lost, {} errored.".format(
+        len(results), won, len(results) - won - len(errored), len(errored)) + color.reset())
+    for result in errored:
+        print(color.text("red") + "  session {}: {} {}".format(result['session'], result['error'], result['message'] or "") + color.reset())
+
+    if telemetry.enabled:
+        print(color.text("cyan") + telemetry.summary() + color.reset())
+
+    if errored:
+        sys.exit(errored[0]['code'])
+    return results
@@ -0,0 +1,57 @@
+# JsonStream: reads a huge json document (e.g. the initial delta) a member at a time, so it never has to be built whole
+#   Objects are walked key by key, and each value is decoded on its own by the standard library's scanner when asked for.
+import re
+import json
+
+_decoder = json.JSONDecoder()
+
+_separators = re.compile(r'[ \t\n\r,]*') # commas are skipped like whitespace, as the server's json is well formed
+
+# the key of the next member with its ':' (without escapes, or with them), the end of the object, or anything else (an error)
+_key = re.compile(r'''[ \t\n\r,]*(?:"([^"\\\x00-\x1f]*)"[ \t\n\r]*:|("(?:[^"\\\x00-\x1f]|\\.)*")[ \t\n\r]*:|(\})|(.|$))''', re.DOTALL)
+
+class JsonStream():
+    def __init__(self, text, pos=0):
+        self.text = text
+        self.pos = pos
+
+    def enter(self):
+        """ reads the '{' of the object next in the stream, if that is what is next
+
+        Returns:
+            bool: if it was, so its members can be read with key() and value()
+        """
+        pos = _separators.match(self.text, self.pos).end()
+        if self.text.startswith('{', pos):
+            self.pos = pos + 1
+            return True
+        return False
+
+    def key(self):
+        """ reads the key of the next member of the object entered
+
+        Returns:
+            str: the key, or None once the object has ended
+        """
+        match = _key.match(self.text, self.pos)
+        self.pos = match.end()
+        group = match.lastindex
+        if group == 1:
+            return match.group(1)
+        if group == 2:
+            return json.loads(match.group(2)) # escapes are rare, let the standard library decode them
+        if group == 3:
+            return None
+        raise ValueError("Expected a key or '}}' in json at {}".format(match.start(4)))
+
+    def value(self):
+        """ decodes the whole value of the member whose key was just read """
+        value, self.pos = _decoder.raw_decode(self.text, _separators.match(self.text, self.pos).end())
+        return value
+
+    def members(self):
+        """ yields the (key, value) members of the object entered, reading each as it is asked for """
+        key = self.key()
+        while key is not None:
+            yield key, self.value()
+            key = self.key()
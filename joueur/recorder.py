@@ -0,0 +1,33 @@
+# Recorder: streams every raw frame received from the server to a file, for replaying a game later without a server.
+#   The file holds one game: recording to a path that already exists replaces it.
+#   Each record is a little-endian float64 unix timestamp and uint32 length, followed by that many bytes of the frame (without its EOT).
+import struct
+
+_header = struct.Struct("<dI")
+
+class Recorder():
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+
+    def write(self, frame, timestamp):
+        self._file.write(_header.pack(timestamp, len(frame)))
+        self._file.write(frame)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+## yields (timestamp, frame bytes) for each frame in a recording, in the order they were received
+def read_recording(path):
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(_header.size)
+            if len(header) < _header.size:
+                return # the end, or a record cut off by the client dying mid write
+            timestamp, length = _header.unpack(header)
+            frame = f.read(length)
+            if len(frame) < length:
+                return
+            yield timestamp, frame
@@ -0,0 +1,112 @@
+# Replay: plays a recording made with --record back through a GameManager and AI, with no socket or server at all.
+#   Every order the AI gets is timed, so turn latency can be benchmarked and profiled deterministically offline.
+import time
+import joueur.client
+import joueur.run
+import joueur.codec as codec
+import joueur.error_code as error_code
+import joueur.ansi_color_coder as color
+from joueur.recorder import read_recording
+from joueur.serializer import deserialize
+from joueur.telemetry import Histogram
+
+# ReplayTransport: stands in for the client while replaying, answering the AI's commands with the "ran" events that were recorded for them
+class ReplayTransport():
+    def __init__(self, path):
+        self._frames = read_recording(path)
+        self._pushed_back = None
+        self.game = None
+        self.ai = None
+        self.manager = None
+        self.unanswered_runs = 0 # commands the AI sent that the recording has no result for, e.g. because the AI changed since it was recorded
+
+    def next_event(self):
+        """Returns:
+            dict: the next recorded event, or None when the recording is over
+        """
+        if self._pushed_back:
+            sent, self._pushed_back = self._pushed_back, None
+            return sent
+
+        record = next(self._frames, None)
+        if record:
+            timestamp, frame = record
+            return codec.loads(frame)
+
+    def push_back(self, sent):
+        self._pushed_back = sent
+
+    def apply_delta(self, data):
+        journal = self.manager.apply_delta_state(data)
+        if self.ai.player: # then the AI is ready for updates
+            self.ai.set_changes(journal)
+            self.ai.game_updated()
+
+    ## what the AI's game objects call instead of sending a command, returns the recorded result of it
+    def run_on_server(self, caller, function_name, args=None):
+        while True:
+            sent = self.next_event()
+            if sent is None or sent['event'] == "order" or sent['event'] == "over":
+                self.push_back(sent)
+                self.unanswered_runs += 1
+                return None
+
+            data = sent['data'] if 'data' in sent else None
+            if sent['event'] == "ran":
+                return deserialize(data, self.game)
+            elif sent['event'] == "delta":
+                self.apply_delta(data)
+            elif sent['event'] == "invalid":
+                self.ai.invalid(data['message'])
+
+## replays the recording at path, returning a Histogram of how long the AI took on each order
+def replay(path):
+    transport = ReplayTransport(path)
+    joueur.client.set_transport(transport)
+
+    order_times = Histogram()
+    game = ai = manager = None
+    skipped_runs = 0
+
+    while True:
+        sent = transport.next_event()
+        if sent is None:
+            break
+
+        event = sent['event']
+        data = sent['data'] if 'data' in sent else None
+
+        if event == "named":
+            game, ai, manager = joueur.run.load_game(data)
+            transport.game, transport.ai, transport.manager = game, ai, manager
+        elif event == "lobbied":
+            manager.set_constants(data['constants'])
+        elif event == "start":
+            ai.set_player(game.get_game_object(data['playerID']))
+            ai.start()
+            ai.game_updated()
+        elif event == "delta":
+            transport.apply_delta(data)
+        elif event == "order":
+            args = deserialize(data['args'], game)
+            started = time.perf_counter()
+            ai._do_order(data['name'], args)
+            order_times.record(time.perf_counter() - started)
+        elif event == "ran":
+            skipped_runs += 1 # the AI sent fewer commands than it did when this was recorded
+        elif event == "invalid":
+            ai.invalid(data['message'])
+        elif event == "over":
+            player = ai.player
+            ai.end(player.won, player.reason_won if player.won else player.reason_lost)
+            break
+        elif event == "fatal":
+            error_code.handle_error(error_code.FATAL_EVENT, message="Recording has a fatal event from the server: " + data['message'])
+
+    print(color.text("cyan") + "Replayed {} orders: mean {:.3f}ms, p50 {:.3f}ms, p99 {:.3f}ms, max {:.3f}ms".format(
+        order_times.count, order_times.mean * 1000, order_times.percentile(50) * 1000, order_times.percentile(99) * 1000, (order_times.max or 0) * 1000) + color.reset())
+    if transport.unanswered_runs or skipped_runs:
+        print(color.text("yellow") + "The AI diverged from the recording: {} commands had no recorded result, {} recorded results were never asked for.".format(
+            transport.unanswered_runs, skipped_runs) + color.reset())
+
+    return order_times
@@ -1,42 +1,107 @@
 import importlib.util
 import joueur.client
+from joueur.async_client import AsyncClient
 import sys
 import joueur.error_code as error_code
+import joueur.codec as codec
+import joueur.telemetry as telemetry
 from joueur.game_manager import GameManager
 from joueur.utilities import camel_case_converter
 import joueur.ansi_color_coder as color
 
 def run(args):
+    prepare(args)
+    play_game(args, joueur.client) # the module drives its own Client, which exits the process once the game is over
+
+## parses what the args need before any game is played, shared by every session of a host
+def prepare(args):
+    _split_server(args)
+    _use_codec(args)
+    telemetry.enable(args.telemetry)
+
+## plays one game through client, either the joueur.client module or a Client session of a host
+def play_game(args, client):
+    client.connect(args.server, args.port, args.print_io, args.pipeline, args.record, args.stream_deltas)
+
+    client.send("alias", args.game)
+    game_name = client.wait_for_event("named")
+
+    game, ai, manager = load_game(game_name, client.handle_error)
+
+    client.setup(game, ai, manager)
+
+    client.send("play", _play_data(args, game_name, ai))
+
+    lobby_data = client.wait_for_event("lobbied")
+
+    _lobbied(manager, lobby_data)
+
+    start_data = client.wait_for_event("start")
+
+    _start(game, ai, start_data, client.handle_error)
+
+    client.play()
+
+## the same as run, but played through an AsyncClient on an asyncio event loop, so the AI's orders can be coroutines
+async def run_async(args):
+    prepare(args)
+
+    client = AsyncClient(args.print_io)
+    await client.connect(args.server, args.port)
+
+    client.send("alias", args.game)
+    game_name = await client.wait_for_event("named")
+
+    game, ai, manager = load_game(game_name)
+
+    client.setup(game, ai, manager)
+
+    client.send("play", _play_data(args, game_name, ai))
+
+    lobby_data = await client.wait_for_event("lobbied")
+
+    _lobbied(manager, lobby_data)
+
+    start_data = await client.wait_for_event("start")
+
+    _start(game, ai, start_data)
+
+    await client.play()
+
+def _split_server(args):
     split_server = args.server.split(":")
     args.server = split_server[0]
     args.port = int((len(split_server) == 2 and split_server[1])) or args.port
 
-    joueur.client.connect(args.server, args.port, args.print_io)
-
-    joueur.client.send("alias", args.game)
-    game_name = joueur.client.wait_for_event("named")
+def _use_codec(args):
+    try:
+        codec.use(args.codec)
+    except ValueError as e:
+        error_code.handle_error(error_code.INVALID_ARGS, e, "Could not use the '{}' json codec.".format(args.codec))
 
+def load_game(game_name, handle_error=error_code.handle_error):
     module_str = "games." + camel_case_converter(game_name)
 
     spec = importlib.util.find_spec(module_str)
     if spec is None:
-        error_code.handle_error(error_code.GAME_NOT_FOUND, None, "Could not find the module for game '{}'.".format(game_name))
+        handle_error(error_code.GAME_NOT_FOUND, None, "Could not find the module for game '{}'.".format(game_name))
 
     try:
         module = importlib.import_module(module_str) # should load Game and AI to load based on the game selected in args
     except ImportError as e:
-        error_code.handle_error(error_code.REFLECTION_FAILED, e, "Could not import game module: '{}'.".format(module_str))
+        handle_error(error_code.REFLECTION_FAILED, e, "Could not import game module: '{}'.".format(module_str))
 
     game = module.Game()
     try:
         ai = module.AI(game)
     except:
-        error_code.handle_error(error_code.AI_ERRORED, sys.exc_info()[0], "Could not initialize AI class. Probably a syntax error in your AI.")
+        handle_error(error_code.AI_ERRORED, sys.exc_info()[0], "Could not initialize AI class. Probably a syntax error in your AI.")
     manager = GameManager(game)
 
-    joueur.client.setup(game, ai, manager)
+    return game, ai, manager
 
-    joueur.client.send("play", {
+def _play_data(args, game_name, ai):
+    return {
         'gameName': game_name,
         'password': args.password,
         'requestedSession': args.session,
@@ -44,16 +109,14 @@ def run(args):
         'playerName': args.name or ai.get_name() or "Python Player",
         'playerIndex': args.index,
         'gameSettings': args.game_settings
-    })
-
-    lobby_data = joueur.client.wait_for_event("lobbied")
+    }
 
+def _lobbied(manager, lobby_data):
     print(color.text("cyan") + "In lobby for game '" + lobby_data['gameName'] + "' in session '" + lobby_data['gameSession'] + "'." + color.reset())
 
     manager.set_constants(lobby_data['constants'])
 
-    start_data = joueur.client.wait_for_event("start")
-
+def _start(game, ai, start_data, handle_error=error_code.handle_error):
     print(color.text("green") + "Game is starting." + color.reset())
 
     ai.set_player(game.get_game_object(start_data['playerID']))
@@ -61,6 +124,4 @@ def run(args):
         ai.start()
         ai.game_updated()
     except:
-        error_code.handle_error(error_code.AI_ERRORED, sys.exc_info()[0], "AI errored during game initialization")
-
-    joueur.client.play()
+        handle_error(error_code.AI_ERRORED, sys.exc_info()[0], "AI errored during game initialization")
@@ -1,42 +1,126 @@
 # Serializer: functions to serialize and unserialize json communication strings
+#   Both walk nested data with an explicit stack instead of recursing, dispatching on each value's exact type via a table that learns new types (e.g. each game object class) the first time it sees them.
 from joueur.base_game_object import BaseGameObject
 
+# what kind of value a type is, for the dispatch tables below. Never 0, so `_kinds.get(t) or _kind(value)` only falls back for unseen types
+_SCALAR = 1
+_LIST = 2
+_DICT = 3
+_GAME_OBJECT = 4
+
+HOMOGENEOUS_LIST_LENGTH = 8 # lists at least this long are checked for being all scalars or all game objects, shorter ones aren't worth the extra pass
+
+_kinds = {
+    str: _SCALAR,
+    int: _SCALAR,
+    float: _SCALAR,
+    bool: _SCALAR,
+    type(None): _SCALAR,
+    list: _LIST,
+    tuple: _LIST,
+    dict: _DICT
+}
+
+def _kind(value):
+    kind = _kinds.get(type(value))
+    if kind is None: # a type not seen yet, e.g. a game object class or a subclass of a builtin
+        if isinstance(value, BaseGameObject):
+            kind = _GAME_OBJECT
+        elif isinstance(value, (list, tuple)):
+            kind = _LIST
+        elif isinstance(value, dict):
+            kind = _DICT
+        else:
+            kind = _SCALAR
+        _kinds[type(value)] = kind
+    return kind
+
 def is_game_object_reference(d):
     return (isinstance(d, dict) and len(d) == 1 and 'id' in d)
 
 def is_object(obj):
-    return (isinstance(obj, dict) or isinstance(obj, list)) or isinstance(obj, BaseGameObject)
+    return (_kinds.get(type(obj)) or _kind(obj)) != _SCALAR
 
+## the json-able form of data: game objects become {'id': ...} references, lists and tuples stay lists
 def serialize(data):
-    if not isinstance(data, (list, dict, BaseGameObject)):
+    kind = _kinds.get(type(data)) or _kind(data)
+    if kind == _SCALAR:
         return data
-
-    if isinstance(data, BaseGameObject):
+    if kind == _GAME_OBJECT:
         return {'id': data.id}
 
-    serialized = {}
-    for key in data:
-        value = data[key]
-        if is_object(value):
-            serialized[key] = serialize(value)
+    serialized = [] if kind == _LIST else {}
+    stack = [(data, serialized)]
+    while stack:
+        source, target = stack.pop()
+        if type(target) is list:
+            if len(source) >= HOMOGENEOUS_LIST_LENGTH:
+                first = _kinds.get(type(source[0]))
+                if first == _SCALAR and all(_kinds.get(type(value)) == _SCALAR for value in source):
+                    target.extend(source) # e.g. a list of numbers or strings
+                    continue
+                if first == _GAME_OBJECT and all(_kinds.get(type(value)) == _GAME_OBJECT for value in source):
+                    target.extend([{'id': value.id} for value in source])
+                    continue
+            items = enumerate(source)
+            target.extend([None] * len(source))
         else:
-            serialized[key] = value
+            items = source.items()
+
+        for key, value in items:
+            kind = _kinds.get(type(value)) or _kind(value)
+            if kind == _SCALAR:
+                target[key] = value
+            elif kind == _GAME_OBJECT:
+                target[key] = {'id': value.id}
+            else:
+                child = [] if kind == _LIST else {}
+                target[key] = child
+                stack.append((value, child))
     return serialized
 
+## the inverse of serialize, with references looked up as the game objects in game they refer to
 def deserialize(data, game):
-    if not isinstance(data, (list, dict, BaseGameObject)):
-        return data
+    kind = type(data)
+    if kind is not dict and kind is not list:
+        return data # json only decodes to dicts, lists, and scalars
 
-    if is_game_object_reference(data):
-        return game.get_game_object(data['id'])
+    game_objects = game.game_objects
+    if kind is dict:
+        if len(data) == 1 and 'id' in data:
+            return game_objects.get(data['id'])
+        deserialized = {}
+    else:
+        deserialized = []
 
-    # else if we got here it's a list or dict
-    deserialized = [None] * len(data) if isinstance(data, list) else {}
-    seq_iter = data.items if isinstance(data, dict) else enumerate(data)
-    for key, value in seq_iter:
-        if is_object(value):
-            deserialized[key] = deserialize(value, game)
+    stack = [(data, deserialized)]
+    while stack:
+        source, target = stack.pop()
+        if type(target) is list:
+            if len(source) >= HOMOGENEOUS_LIST_LENGTH:
+                first = type(source[0])
+                if first is not dict and first is not list and all(type(value) is not dict and type(value) is not list for value in source):
+                    target.extend(source) # no references or containers in it
+                    continue
+                if first is dict and all(type(value) is dict and len(value) == 1 and 'id' in value for value in source):
+                    target.extend([game_objects.get(value['id']) for value in source]) # e.g. a list of cowboys
+                    continue
+            items = enumerate(source)
+            target.extend([None] * len(source))
         else:
-            deserialized[key] = value
+            items = source.items()
 
+        for key, value in items:
+            kind = type(value)
+            if kind is dict:
+                if len(value) == 1 and 'id' in value:
+                    target[key] = game_objects.get(value['id'])
+                else:
+                    child = target[key] = {}
+                    stack.append((value, child))
+            elif kind is list:
+                child = target[key] = []
+                stack.append((value, child))
+            else:
+                target[key] = value
     return deserialized
@@ -0,0 +1,118 @@
+# Snapshots: an immutable view of the game at every delta, that AIs can read past turns from, or branch hypotheticals off of
+#   Each game object has a history of versions, a namedtuple of its fields with game objects as their ids, lists as tuples, and dicts as read only views.
+#   A delta only adds versions for the game objects its ChangeJournal says it created or changed, every other one is shared with the snapshot before it.
+from bisect import bisect_right
+from collections import namedtuple
+from operator import attrgetter
+from types import MappingProxyType
+from joueur.base_game_object import BaseGameObject
+from joueur.game_manager import compile_applier, SCALAR, REFERENCE
+
+def _freeze(value):
+    if isinstance(value, BaseGameObject):
+        return value.id
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+# @class Snapshots: the history of the game objects of the given classes (all of the game's by default), from when it is made on
+class Snapshots():
+    def __init__(self, game, classes=None):
+        self.game = game
+        self._records = {} # game object class: (the namedtuple its versions are, a getter of all its fields, the indexes of its references, and of the rest to _freeze)
+        for cls in (classes or game._game_object_classes.values()):
+            fields = sorted((name != 'id', name, attribute, kind) for kind, attribute, name in compile_applier(cls).values()) # id first
+            getter = attrgetter(*[attribute for _, _, attribute, _ in fields])
+            references = [index for index, (_, _, _, kind) in enumerate(fields) if kind == REFERENCE]
+            frozen = [index for index, (_, _, _, kind) in enumerate(fields) if kind != SCALAR and kind != REFERENCE]
+            self._records[cls] = (namedtuple(cls.__name__, [name for _, name, _, _ in fields]), getter, references, frozen)
+        self._turns = [] # the game's current_turn at each version
+        self._history = {} # id: ([version it changed at], [its record from then on])
+        self.record(None)
+
+    @property
+    def version(self):
+        """int: the latest version, one for each delta recorded """
+        return len(self._turns) - 1
+
+    def record(self, journal):
+        """ adds a version for the delta the ChangeJournal is of, or of every game object when it is None (e.g. the AI's changes on its first game_updated) """
+        if journal is None:
+            objects = self.game._game_objects.values()
+        else:
+            objects = set(journal.created)
+            objects.update(obj for obj, _, _, _ in journal.changes)
+
+        version = len(self._turns)
+        self._turns.append(self.game.current_turn)
+        records = self._records
+        history = self._history
+        for obj in objects:
+            cls = type(obj)
+            if cls not in records:
+                continue # the game, or a class not asked for
+            record, getter, references, frozen = records[cls]
+            values = list(getter(obj))
+            for index in references:
+                value = values[index]
+                if value is not None:
+                    values[index] = _freeze(value)
+            for index in frozen:
+                values[index] = _freeze(values[index])
+            versions = history.get(values[0])
+            if versions is None:
+                versions = history[values[0]] = ([], [])
+            versions[0].append(version)
+            versions[1].append(tuple.__new__(record, values)) # what record._make does, without checking the length the getter already fixed
+
+    def at(self, version=None):
+        """ the Snapshot at a version, the latest one by default """
+        return Snapshot(self, self.version if version is None else version)
+
+    def of_turn(self, turn):
+        """ the Snapshot of the game as it was at the end of a turn, once every delta of it came in (so far, for the current turn)
+
+        Returns:
+            Snapshot, or None if the turn is from before the first version, or not recorded yet
+        """
+        version = bisect_right(self._turns, turn) - 1
+        if version < 0 or (turn > self._turns[-1]):
+            return None
+        return Snapshot(self, version)
+
+# @class Snapshot: the game objects' records at one version, which never changes
+class Snapshot():
+    def __init__(self, snapshots, version, overlay=None):
+        self._snapshots = snapshots
+        self.version = version
+        self.turn = snapshots._turns[version]
+        self._overlay = overlay # id: record, what a hypothetical replaced
+
+    def get(self, id):
+        """ the record of the game object with the given id, or None if it didn't exist yet (or isn't of a class recorded) """
+        if self._overlay and id in self._overlay:
+            return self._overlay[id]
+        versions = self._snapshots._history.get(id)
+        if versions is None:
+            return None
+        index = bisect_right(versions[0], self.version) - 1
+        return versions[1][index] if index >= 0 else None
+
+    def all(self, cls):
+        """ the records of every game object of the class (e.g. Cowboy) that existed at this version """
+        record = self._snapshots._records[cls][0]
+        found = []
+        for id in self._snapshots._history:
+            found_record = self.get(id)
+            if type(found_record) is record:
+                found.append(found_record)
+        return found
+
+    def replaced(self, *records):
+        """ a hypothetical Snapshot, the same as this one but for the records given (e.g. cowboy._replace(tile=...)), sharing all the rest """
+        overlay = dict(self._overlay) if self._overlay else {}
+        for record in records:
+            overlay[record.id] = record
+        return Snapshot(self._snapshots, self.version, overlay)
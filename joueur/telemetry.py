@@ -0,0 +1,124 @@
+# Telemetry: counters and fixed-bucket latency histograms of what goes through the client.
+#   Everything here is skipped by the client unless enabled, checking `telemetry.enabled` is the only cost when it is not.
+#   It is process wide: under --sessions every session's Client adds to the same counters and histograms (behind a lock, as they play on
+#   their own threads), and the host prints one summary of all of them once every session is over.
+import threading
+from bisect import bisect_left
+
+enabled = False
+
+# the upper bound (in seconds) of each histogram bucket, anything slower lands in a final overflow bucket
+BUCKET_BOUNDS = (
+    0.00001, 0.00002, 0.00005,
+    0.0001, 0.0002, 0.0005,
+    0.001, 0.002, 0.005,
+    0.01, 0.02, 0.05,
+    0.1, 0.2, 0.5,
+    1.0, 2.0, 5.0
+)
+
+# Histogram: how many values fell into each of a fixed set of buckets, plus their count, total, min and max
+class Histogram():
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    ## the upper bound of the bucket the given percentile (0 to 100) falls in, capped at the max value seen
+    def percentile(self, percent):
+        if not self.count:
+            return 0.0
+        target = self.count * percent / 100.0
+        seen = 0
+        for i, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'buckets': list(self.buckets)
+        }
+
+_counters = {}
+_histograms = {}
+_lock = threading.Lock() # sessions count and record from their own threads
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+## adds to the named counter
+def count(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+## records a duration (in seconds) in the named histogram
+def record(name, seconds):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.record(seconds)
+
+def counter(name):
+    return _counters.get(name, 0)
+
+def histogram(name):
+    """Returns:
+        Histogram: the named histogram, or None if nothing was ever recorded in it
+    """
+    return _histograms.get(name)
+
+## everything recorded so far, as plain dicts and numbers
+def snapshot():
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'histograms': {name: h.as_dict() for name, h in _histograms.items()}
+        }
+
+## a human readable table of everything recorded so far
+def summary():
+    with _lock:
+        return _summary()
+
+def _summary():
+    lines = ["Telemetry:"]
+    for name in sorted(_counters):
+        lines.append("  {:<32}{:>14}".format(name, _counters[name]))
+    if _histograms:
+        lines.append("  {:<32}{:>8}{:>11}{:>11}{:>11}{:>11}".format("(ms)", "count", "mean", "p50", "p99", "max"))
+    for name in sorted(_histograms):
+        h = _histograms[name]
+        lines.append("  {:<32}{:>8}{:>11.3f}{:>11.3f}{:>11.3f}{:>11.3f}".format(name, h.count, h.mean * 1000, h.percentile(50) * 1000, h.percentile(99) * 1000, h.max * 1000))
+    return "\n".join(lines)
@@ -2,7 +2,10 @@
 # Instead have a look at `README.md` for how to start writing you AI.
 
 import argparse
-from joueur.run import run
+import asyncio
+from joueur.run import run, run_async
+from joueur.replay import replay
+from joueur.host import host
 
 parser = argparse.ArgumentParser(description='Runs the python client with options. Must provide a game name to play on the server.')
 parser.add_argument('game', action='store', help='the name of the game you want to play on the server')
@@ -13,6 +16,22 @@ parser.add_argument('-i, --index', action='store', dest='index', help='the playe
 parser.add_argument('-w, --password', action='store', dest='password', default=None, help='the password required for authentication on official servers')
 parser.add_argument('-r, --session', action='store', dest='session', default='*', help='the requested game session you want to play on the server')
 parser.add_argument('--gameSettings', action='store', dest='game_settings', default=None, help='Any settings for the game server to force. Must be url parms formatted (key=value&otherKey=otherValue)')
+parser.add_argument('--codec', action='store', dest='codec', default='auto', help='the json library used to encode and decode what goes through the socket: orjson, ujson or json. Defaults to the fastest one installed')
+parser.add_argument('--pipeline', action='store_true', dest='pipeline', help='send commands without waiting for each result, results are only waited on when read')
+parser.add_argument('--async', action='store_true', dest='use_async', help='play through the asyncio client, so the AI\'s orders can be coroutines that await game object commands')
+parser.add_argument('--stream-deltas', action='store', dest='stream_deltas', type=int, default=None, help='merge delta frames at least this many bytes straight from their json as it is read, instead of decoding them whole first. Slower, but far less memory on huge maps')
+parser.add_argument('--telemetry', action='store_true', dest='telemetry', help='record byte/frame counters and latency histograms of the client, summarized when the game is over (with --sessions, once for all of them)')
+parser.add_argument('--record', action='store', dest='record', default=None, help='write every frame received from the server to this file (replacing it), so the game can be replayed offline with --replay')
+parser.add_argument('--replay', action='store', dest='replay', default=None, help='instead of connecting to a server, play back a file made with --record through the AI and time each turn')
+parser.add_argument('--sessions', action='store', dest='sessions', type=int, default=1, help='play this many games at once from this one process, each in its own session. One failing only ends that session')
 parser.add_argument('--printIO', action='store_true', dest='print_io', help='(debugging) print IO through the TCP socket to the terminal')
 
-run(parser.parse_args())
+args = parser.parse_args()
+if args.replay:
+    replay(args.replay)
+elif args.sessions > 1:
+    host(args)
+elif args.use_async:
+    asyncio.run(run_async(args))
+else:
+    run(args)
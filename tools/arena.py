@@ -0,0 +1,216 @@
+# Arena: plays many games in parallel, each in its own worker process, for evaluating a strategy over hundreds of games rather than one.
+#   Each game is either one client against a local stand-in server (the default, started in this process), or two clients playing each other
+#   in their own session of a real game server (--server). Every game's result is appended to a json lines file as it finishes.
+#   A game still running --timeout seconds (plus a grace for its clients to time out themselves) after it started has its worker terminated,
+#   so a stuck AI never holds one of the --jobs slots for longer than that.
+#
+#   python3 -m tools.arena --games 200 [--jobs N] [--timeout SECONDS] [--results arena.jsonl]
+#   python3 -m tools.arena --games 200 --server localhost:3000
+import argparse
+import asyncio
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import joueur.codec as codec
+import joueur.run
+from joueur.client import Client
+from joueur.host import play_session
+from joueur.telemetry import Histogram
+from tools.stand_in_server import StandInServer, SyntheticGame
+
+KILL_GRACE = 5.0 # seconds past --timeout a game's worker is given before it is terminated, for its clients to end with SERVER_TIMEOUT first
+
+
+def _session_args(options, session, index):
+    """the same args main.py would parse, for one client of one game"""
+    return argparse.Namespace(game=options['game'], server=options['server'], port=3000, name=None, index=index,
+        password=None, session=session, game_settings=None, codec=options['codec'], pipeline=options['pipeline'],
+        use_async=False, telemetry=False, record=None, replay=None, print_io=False, sessions=1, stream_deltas=None)
+
+
+def _play_client(options, session, index):
+    client = Client(exit_process=False)
+    client.order_times = Histogram()
+    started = time.perf_counter()
+    client.deadline = started + options['timeout']
+
+    args = _session_args(options, session, index)
+    joueur.run.prepare(args)
+    result = play_session(args, index, client)
+    result['seconds'] = time.perf_counter() - started
+    result['turns'] = client.order_times.count
+    result['order_ms'] = {
+        'mean': client.order_times.mean * 1000,
+        'p50': client.order_times.percentile(50) * 1000,
+        'p99': client.order_times.percentile(99) * 1000,
+        'max': (client.order_times.max or 0) * 1000
+    }
+    return result
+
+
+def _session_name(game_index, options):
+    return "arena-{}-{}".format(options['run_id'], game_index)
+
+
+def play_arena_game(game_index, options):
+    """runs in a worker: plays one game, with both of its clients when against an opponent, returning its result record"""
+    session = _session_name(game_index, options)
+    if options['opponent']:
+        with ThreadPoolExecutor(max_workers=2) as pool: # both players have to be connected for the game to start
+            clients = list(pool.map(lambda index: _play_client(options, session, index), range(2)))
+    else:
+        clients = [_play_client(options, session, 0)]
+
+    return {'game': game_index, 'session': session, 'players': clients}
+
+
+def _quiet_worker():
+    sys.stdout = open(os.devnull, 'w') # every client printing every game would drown out the progress, the results file has what matters
+
+
+def _worker(connection, game_index, options, verbose):
+    """the body of a game's worker process, sending its result record back through the connection"""
+    if not verbose:
+        _quiet_worker()
+    connection.send(play_arena_game(game_index, options))
+    connection.close()
+
+
+def _failed_game(game_index, options, error, message, seconds):
+    """the result record of a game whose worker never sent one back: every player of it errored"""
+    players = [{'session': index, 'error': error, 'code': None, 'message': message, 'seconds': seconds, 'turns': 0}
+        for index in range(2 if options['opponent'] else 1)]
+    return {'game': game_index, 'session': _session_name(game_index, options), 'players': players}
+
+
+def play_games(options, jobs, verbose=False):
+    """plays every game, at most jobs at once, yielding each one's result record as it finishes (or is terminated for taking too long)"""
+    to_start = deque(range(options['games']))
+    running = {} # the connection a worker sends its result through: (game index, its Process, when it started)
+    limit = options['timeout'] + KILL_GRACE
+    while to_start or running:
+        while to_start and len(running) < jobs:
+            game_index = to_start.popleft()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_worker, args=(sender, game_index, options, verbose), daemon=True)
+            process.start()
+            sender.close() # so the receiver sees EOF if the worker dies without sending
+            running[receiver] = (game_index, process, time.perf_counter())
+
+        next_limit = min(started for _, _, started in running.values()) + limit
+        for receiver in multiprocessing.connection.wait(list(running), timeout=max(0.0, next_limit - time.perf_counter())):
+            game_index, process, started = running.pop(receiver)
+            try:
+                record = receiver.recv()
+            except EOFError:
+                record = None
+            receiver.close()
+            process.join()
+            if record is None:
+                record = _failed_game(game_index, options, 'WORKER_DIED', "its worker exited with code {} before sending a result".format(process.exitcode), time.perf_counter() - started)
+            yield record
+
+        now = time.perf_counter()
+        for receiver, (game_index, process, started) in list(running.items()):
+            if now - started > limit:
+                del running[receiver]
+                process.terminate()
+                process.join()
+                receiver.close()
+                record = _failed_game(game_index, options, 'GAME_TIMEOUT', "still playing after {:.0f}s, its worker was terminated".format(now - started), now - started)
+                record['timed_out'] = True
+                yield record
+
+
+def start_stand_in(options):
+    """runs a stand-in server on a free port in a background thread, returning that port"""
+    started = threading.Event()
+    bound = {}
+
+    async def serve():
+        stand_in = StandInServer(lambda session: SyntheticGame(session, options['turns'], cowboys=0))
+        server = await asyncio.start_server(stand_in.handle, 'localhost', 0, backlog=1024, limit=1 << 26)
+        bound['port'] = server.sockets[0].getsockname()[1]
+        started.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    started.wait()
+    return bound['port']
+
+
+## plays every game, writing each result to the results file as it comes in, and returns a summary of them all
+def run_arena(options, results_path, jobs, verbose=False):
+    won = lost = errored = timed_out = 0
+    order_ms = Histogram()
+    started = time.perf_counter()
+
+    with open(results_path, 'a') as results:
+        for done, record in enumerate(play_games(options, jobs, verbose), 1):
+            results.write(codec.dumps(record).decode('utf-8') + "\n")
+            results.flush()
+            timed_out += record.get('timed_out', False)
+
+            for player in record['players']:
+                if 'error' in player:
+                    errored += 1
+                elif player.get('won'):
+                    won += 1
+                else:
+                    lost += 1
+                if player['turns']:
+                    order_ms.record(player['order_ms']['mean'] / 1000)
+            print("{}/{} games, {} wins, {} losses, {} errored clients".format(done, options['games'], won, lost, errored), end="\r" if sys.stdout.isatty() else "\n")
+
+    elapsed = time.perf_counter() - started
+    return {'games': options['games'], 'won': won, 'lost': lost, 'errored': errored, 'timed_out': timed_out, 'seconds': elapsed,
+        'games_per_second': options['games'] / elapsed if elapsed else 0.0, 'mean_order_ms': order_ms.mean * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays many games in parallel and collects their results into one json lines file.')
+    parser.add_argument('--game', default='Saloon')
+    parser.add_argument('--games', type=int, default=100, help='how many games to play')
+    parser.add_argument('--server', default=None, help='a game server (host:port) to pair two of our clients up on for each game, instead of a local stand-in server')
+    parser.add_argument('--jobs', type=int, default=None, help='games played at once, defaults to one per core (leaving one for the stand-in server when it is used)')
+    parser.add_argument('--timeout', type=float, default=300.0, help='seconds a game may take: its clients give up waiting on the server with SERVER_TIMEOUT then, and a game still running {:.0f}s later (e.g. an AI stuck in run_turn) has its worker terminated and is recorded as GAME_TIMEOUT'.format(KILL_GRACE))
+    parser.add_argument('--turns', type=int, default=100, help='orders in each stand-in server game')
+    parser.add_argument('--results', default='arena.jsonl', help='json lines file each game\'s result is appended to')
+    parser.add_argument('--codec', default='auto')
+    parser.add_argument('--pipeline', action='store_true')
+    parser.add_argument('--verbose', action='store_true', help='let the clients print to the terminal')
+    args = parser.parse_args()
+
+    options = {
+        'game': args.game,
+        'games': args.games,
+        'codec': args.codec,
+        'pipeline': args.pipeline,
+        'timeout': args.timeout,
+        'turns': args.turns,
+        'run_id': uuid.uuid4().hex[:8], # keeps session names unique between arena runs on the same server
+        'opponent': args.server is not None,
+        'server': args.server
+    }
+    cores = os.cpu_count() or 1
+    if options['opponent']:
+        jobs = args.jobs or cores
+    else:
+        options['server'] = "localhost:{}".format(start_stand_in(options))
+        jobs = args.jobs or max(1, cores - 1)
+
+    summary = run_arena(options, args.results, jobs, args.verbose)
+    print()
+    print("{games} games in {seconds:.1f}s ({games_per_second:.2f} games/s): {won} wins, {lost} losses, {errored} errored clients ({timed_out} games timed out), AI took {mean_order_ms:.3f}ms per order on average".format(**summary))
+    print("Results appended to " + args.results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Micro-benchmark of the json codecs in joueur.codec on Saloon frames: the delta and ran events the client decodes, and the run/finished events it encodes
+#   python3 -m tools.bench_codec [--turns N] [--logs N]
+import argparse
+import joueur.codec as codec
+from tools.bench_timing import per_item
+from tools.saloon_payloads import SaloonWorkload, event
+
+
+def payloads(turns, log_volume):
+    workload = SaloonWorkload(log_volume=log_volume)
+    initial = event('delta', workload.initial_delta())
+    deltas = [event('delta', delta) for delta in workload.deltas(turns)]
+    decode = {
+        'initial delta': [initial],
+        'turn deltas': deltas,
+        'ran': [event('ran', True)] * turns
+    }
+    encode = {
+        'run': [event('run', workload.run_payload(name)) for name in ('move', 'act', 'play', 'callIn')] * turns,
+        'finished': [event('finished', {'orderIndex': i, 'returned': True}) for i in range(turns)]
+    }
+    return decode, encode
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times encoding and decoding Saloon frames with each available json codec.')
+    parser.add_argument('--turns', type=int, default=200, help='how many turn deltas to generate')
+    parser.add_argument('--logs', type=int, default=2, help='log messages added per turn')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each measurement, the best is kept')
+    args = parser.parse_args()
+
+    decode, encode = payloads(args.turns, args.logs)
+    results = {}
+    for name in codec.available():
+        codec.use(name)
+        for label, items in decode.items():
+            frames = [codec.dumps(item) for item in items]
+            results['decode ' + label, name] = per_item(codec.loads, frames, args.repeat)
+        for label, items in encode.items():
+            results['encode ' + label, name] = per_item(codec.dumps, items, args.repeat)
+
+    names = codec.available()
+    print("{:<24}".format("payload") + "".join("{:>14}".format(name + " us") for name in names) + "{:>10}".format("speedup"))
+    for label in sorted(set(label for label, _ in results)):
+        times = [results[label, name] for name in names]
+        print("{:<24}".format(label) + "".join("{:>14.2f}".format(t * 1e6) for t in times) + "{:>9.1f}x".format(times[-1] / times[0]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Times the Game's NumPy board layers (games/saloon/board.py): their board-wide queries against asking every tile the same
+# through the util predicates, and what keeping them up to date adds to merging a turn's delta. Needs NumPy.
+#   python3 -m tools.bench_layers [--map-width N] [--map-height N] [--cowboys N] [--turns N] [--repeat N]
+import argparse
+from unittest import mock
+from games.saloon import game as saloon_game
+from games.saloon.ponder import live_bottles
+from games.saloon.util import is_near_enemy_piano, threatened_tiles, wall_func
+from tools.bench_timing import best, merge_turn, new_manager
+from tools.saloon_payloads import SaloonWorkload
+
+
+class _Player():
+    def __init__(self, player):
+        self.player = player # the ai is_near_enemy_piano asks for
+
+
+def merge_with_layers(initial, turns, repeat, layers):
+    """best seconds per turn delta, with the Game keeping its layers or not"""
+    with mock.patch.object(saloon_game.Layers, 'available', layers):
+        return merge_turn([initial], turns, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the Game's NumPy board layers against the per tile predicates they vectorize.")
+    parser.add_argument('--map-width', type=int, default=44)
+    parser.add_argument('--map-height', type=int, default=24)
+    parser.add_argument('--cowboys', type=int, default=30)
+    parser.add_argument('--turns', type=int, default=100, help='turn deltas to merge')
+    parser.add_argument('--repeat', type=int, default=20, help='runs of each measurement, the best is kept')
+    args = parser.parse_args()
+
+    workload = SaloonWorkload(map_width=args.map_width, map_height=args.map_height, cowboys=args.cowboys, bottles=args.cowboys // 2)
+    initial = workload.initial_delta()
+    turns = list(workload.deltas(args.turns))
+    manager = new_manager()
+    manager.apply_delta_state(initial)
+    for delta in turns:
+        manager.apply_delta_state(delta)
+    game = manager.game
+    layers = game.layers
+    if layers is None:
+        raise SystemExit("NumPy isn't installed, so the game has no layers")
+    ai = _Player(game.players[0])
+
+    queries = [
+        ('walls', lambda: [wall_func(tile) for tile in game.tiles], layers.walls),
+        ('threatened', lambda: threatened_tiles(live_bottles(game)), layers.threatened),
+        ('near_enemy_pianos', lambda: [is_near_enemy_piano(tile, ai) for tile in game.tiles], lambda: layers.near_enemy_pianos(ai.player))
+    ]
+    print("{}x{} map, {} cowboys".format(args.map_width, args.map_height, args.cowboys))
+    print("{:<24}{:>14}{:>14}{:>10}".format("whole board query", "per tile us", "layers us", "speedup"))
+    for name, per_tile, layered in queries:
+        slow, fast = best(per_tile, args.repeat), best(layered, args.repeat)
+        print("{:<24}{:>14.1f}{:>14.1f}{:>9.1f}x".format(name, slow * 1e6, fast * 1e6, slow / fast))
+
+    without, with_layers = merge_with_layers(initial, turns, args.repeat // 4 or 1, False), merge_with_layers(initial, turns, args.repeat // 4 or 1, True)
+    print("merging a turn's delta: {:.1f} us without layers, {:.1f} us keeping them up to date".format(without * 1e6, with_layers * 1e6))
+
+
+if __name__ == '__main__':
+    main()
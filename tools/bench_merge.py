@@ -0,0 +1,103 @@
+# Micro-benchmark of GameManager.apply_delta_state against the recursive merge it replaced, on a synthetic Saloon game's deltas
+#   python3 -m tools.bench_merge [--turns N] [--repeat N]
+import argparse
+import copy
+from joueur.delta_mergeable import DeltaMergeable
+from joueur.game_manager import compile_applier
+from joueur.serializer import is_game_object_reference, is_object
+from joueur.utilities import camel_case_converter
+from tools.bench_timing import merge_turn, new_manager
+from tools.saloon_payloads import SaloonWorkload
+
+
+# the previous implementation, as it was, to compare against. It deletes each &LEN from the delta it merges
+def legacy_merge_delta(manager, state, delta):
+    delta_length = -1
+    if manager._DELTA_LIST_LENGTH in delta:
+        delta_length = delta[manager._DELTA_LIST_LENGTH]
+        del delta[manager._DELTA_LIST_LENGTH]
+
+    if delta_length > -1:
+        while len(state) > delta_length:
+            state.pop()
+        while len(state) < delta_length:
+            state.append(None)
+
+    for key in delta:
+        d = delta[key]
+        state_key = key
+        key_in_state = False
+
+        if isinstance(state, list):
+            state_key = int(key)
+            key_in_state = state_key < len(state)
+        else:
+            if isinstance(state, DeltaMergeable):
+                state_key = "_" + camel_case_converter(state_key)
+            key_in_state = state_key in state
+
+        if d == manager._DELTA_REMOVED:
+            if key_in_state:
+                del state[state_key]
+        elif is_game_object_reference(d):
+            manager._set_member(state, state_key, manager.game.get_game_object(d['id']))
+        elif is_object(d) and key_in_state and is_object(state[state_key]):
+            legacy_merge_delta(manager, state[state_key], d)
+        elif not key_in_state and is_object(d):
+            if isinstance(d, dict):
+                state[state_key] = [] if d in manager._DELTA_LIST_LENGTH else {}
+                legacy_merge_delta(manager, state[state_key], d)
+        else:
+            manager._set_member(state, state_key, d)
+
+def legacy_apply_delta_state(manager, delta):
+    if 'gameObjects' in delta:
+        manager._init_game_objects(delta['gameObjects'])
+    legacy_merge_delta(manager, manager.game, delta)
+
+
+def state_of(manager):
+    """every object's fields the server sets, with game objects as ids, to check both merges agree"""
+    def plain(value):
+        if isinstance(value, DeltaMergeable):
+            return value.id
+        if isinstance(value, list):
+            return [plain(v) for v in value]
+        if isinstance(value, dict):
+            return {k: plain(v) for k, v in value.items()}
+        return value
+    objects = dict(manager.game._game_objects, game=manager.game)
+    return {id: {attribute: plain(getattr(obj, attribute)) for _, attribute, _ in compile_applier(type(obj)).values()} for id, obj in objects.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times GameManager.apply_delta_state against the recursive merge it replaced.')
+    parser.add_argument('--turns', type=int, default=200, help='turn deltas to merge after the initial one')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each measurement, the best is kept')
+    args = parser.parse_args()
+
+    rows = []
+    for label, workload in (
+            ('small map', SaloonWorkload()),
+            ('large map', SaloonWorkload(map_width=44, map_height=24, cowboys=30, bottles=20)),
+            ('large map, logs', SaloonWorkload(map_width=44, map_height=24, cowboys=30, bottles=20, log_volume=10))):
+        initial = [workload.initial_delta()]
+        turns = list(workload.deltas(args.turns))
+
+        legacy, new = new_manager(), new_manager()
+        for delta in initial + turns:
+            legacy_apply_delta_state(legacy, copy.deepcopy(delta))
+            new.apply_delta_state(delta)
+        if state_of(legacy) != state_of(new):
+            raise SystemExit("the merges disagree on the " + label)
+
+        rows.append((label + ' initial', merge_turn([], initial, args.repeat, legacy_apply_delta_state), merge_turn([], initial, args.repeat)))
+        rows.append((label + ' turns', merge_turn(initial, turns, args.repeat, legacy_apply_delta_state), merge_turn(initial, turns, args.repeat)))
+
+    print("{:<32}{:>14}{:>14}{:>10}".format("deltas", "legacy us", "new us", "speedup"))
+    for label, legacy, new in rows:
+        print("{:<32}{:>14.2f}{:>14.2f}{:>10}".format(label, legacy * 1e6, new * 1e6, "{:.1f}x".format(legacy / new)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Measures the Saloon game objects themselves: the memory a merged game holds, per game object, and how long a BFS heavy turn
+# (every cowboy flooding the map through the util BFSes and scanning down the lines it could throw or shoot along, and every tile
+# checked for bottles coming, reading the tiles' fields and the AI's scratch fields on them) takes
+#   python3 -m tools.bench_objects [--map-width N] [--map-height N] [--cowboys N] [--repeat N]
+import argparse
+import gc
+import time
+import tracemalloc
+from collections import Counter
+from games.saloon.strategy import best_bang_direction, best_drunk_direction, best_throw_direction
+from games.saloon.util import cowboy_bfs, distance_field, safe, wall_func
+from tools.bench_merge import new_manager
+from tools.saloon_payloads import SaloonWorkload
+
+
+def merged(initial):
+    manager = new_manager()
+    manager.apply_delta_state(initial)
+    return manager
+
+
+def _reached(field):
+    return sum(1 for distance in field[0] if distance is not None)
+
+
+def bfs_turn(game):
+    """what a turn of the AI does the most of: BFSes from every cowboy and young gun, over every tile they can reach"""
+    reached = 0
+    for cowboy in game.cowboys:
+        if cowboy.tile:
+            cowboy.assignment = cowboy_bfs(cowboy, lambda tile: tile.piano is not None and tile.danger is None)
+            reached += _reached(distance_field(cowboy.tile, lambda tile: False, wall_func))
+            best_bang_direction(cowboy)
+            best_throw_direction(cowboy)
+            best_drunk_direction(cowboy.tile)
+    for player in game.players:
+        young_gun = player.young_gun
+        if young_gun and young_gun.tile:
+            reached += _reached(distance_field(young_gun.tile, lambda tile: tile.danger, wall_func))
+    for tile in game.tiles:
+        safe(tile)
+    return reached
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the memory a merged Saloon game holds, and the time of a BFS heavy turn over it.')
+    parser.add_argument('--map-width', type=int, default=44)
+    parser.add_argument('--map-height', type=int, default=24)
+    parser.add_argument('--cowboys', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=20, help='runs of the turn, the best is kept')
+    args = parser.parse_args()
+
+    workload = SaloonWorkload(map_width=args.map_width, map_height=args.map_height, cowboys=args.cowboys, bottles=args.cowboys // 2)
+    initial = workload.initial_delta()
+
+    gc.collect()
+    tracemalloc.start()
+    manager = merged(initial)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    game = manager.game
+    objects = game._game_objects
+    for tile in game.tiles:
+        tile.piano = None # the scratch fields set_tile_piano and the ponderer keep on tiles
+        tile.danger = None
+
+    best = None
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        reached = bfs_turn(game)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    counts = Counter(type(obj).__name__ for obj in objects.values())
+    print("{}x{} map, {} game objects ({})".format(args.map_width, args.map_height, len(objects), ", ".join("{} {}".format(n, name) for name, n in sorted(counts.items()))))
+    print("held by the merged game: {:.0f} KiB, {:.0f} bytes per game object".format(held / 1024, held / len(objects)))
+    print("BFS heavy turn: {:.2f} ms, {} tiles reached".format(best * 1000, reached))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# Micro-benchmark of joueur.serializer against the recursive serializer it replaced, on large nested payloads of a synthetic Saloon game's objects
+#   python3 -m tools.bench_serializer [--repeat N]
+import argparse
+from joueur.base_game_object import BaseGameObject
+from joueur.serializer import serialize, deserialize
+from tools.bench_timing import new_manager, per_item
+from tools.saloon_payloads import SaloonWorkload
+
+
+# the previous implementation, as it was, to compare against. It turns lists into index keyed dicts (or fails on them), and can't deserialize dicts
+def _legacy_is_object(obj):
+    return (isinstance(obj, dict) or isinstance(obj, list)) or isinstance(obj, BaseGameObject)
+
+def _legacy_is_game_object_reference(d):
+    return (isinstance(d, dict) and len(d) == 1 and 'id' in d)
+
+def legacy_serialize(data):
+    if not isinstance(data, (list, dict, BaseGameObject)):
+        return data
+
+    if isinstance(data, BaseGameObject):
+        return {'id': data.id}
+
+    serialized = {}
+    for key in data:
+        value = data[key]
+        if _legacy_is_object(value):
+            serialized[key] = legacy_serialize(value)
+        else:
+            serialized[key] = value
+    return serialized
+
+def legacy_deserialize(data, game):
+    if not isinstance(data, (list, dict, BaseGameObject)):
+        return data
+
+    if _legacy_is_game_object_reference(data):
+        return game.get_game_object(data['id'])
+
+    deserialized = [None] * len(data) if isinstance(data, list) else {}
+    seq_iter = data.items if isinstance(data, dict) else enumerate(data)
+    for key, value in seq_iter:
+        if _legacy_is_object(value):
+            deserialized[key] = legacy_deserialize(value, game)
+        else:
+            deserialized[key] = value
+
+    return deserialized
+
+
+def saloon_game():
+    manager = new_manager()
+    manager.apply_delta_state(SaloonWorkload(map_width=44, map_height=24, cowboys=30, bottles=20).initial_delta())
+    return manager.game
+
+
+def payloads(game):
+    tiles = game.tiles
+    serialize_payloads = {
+        'run args': [{'tile': tile, 'drunkDirection': "North"} for tile in tiles],
+        'nested dicts': [{tile.id: {'tile': tile, 'x': tile.x, 'around': {'north': tile.tile_north, 'south': tile.tile_south}} for tile in tiles}],
+        'list of objects': [list(tiles)],
+        'nested lists': [[[tile, tile.x, [tile.tile_east, "x"]] for tile in tiles]]
+    }
+    refs = serialize(list(tiles))
+    deserialize_payloads = {
+        'reference': [{'id': tile.id} for tile in tiles],
+        'list of references': [refs],
+        'nested lists': [[[ref, 1, "x", [ref]] for ref in refs]],
+        'nested dicts': [{ref['id']: {'tile': ref, 'n': 1} for ref in refs}]
+    }
+    return serialize_payloads, deserialize_payloads
+
+
+def bench(function, items, repeat):
+    """best seconds per item over `repeat` runs, or None if the function can't handle the payload"""
+    try:
+        for item in items:
+            function(item)
+    except Exception:
+        return None
+    return per_item(function, items, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times joueur.serializer against the recursive implementation it replaced.')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each measurement, the best is kept')
+    args = parser.parse_args()
+
+    game = saloon_game()
+    serialize_payloads, deserialize_payloads = payloads(game)
+    rows = []
+    for label, items in serialize_payloads.items():
+        rows.append(('serialize ' + label, bench(legacy_serialize, items, args.repeat), bench(serialize, items, args.repeat)))
+    for label, items in deserialize_payloads.items():
+        rows.append(('deserialize ' + label,
+            bench(lambda item: legacy_deserialize(item, game), items, args.repeat),
+            bench(lambda item: deserialize(item, game), items, args.repeat)))
+
+    print("{:<32}{:>14}{:>14}{:>10}".format("payload", "legacy us", "new us", "speedup"))
+    for label, legacy, new in rows:
+        print("{:<32}{:>14}{:>14.2f}{:>10}".format(label,
+            "fails" if legacy is None else "{:.2f}".format(legacy * 1e6), new * 1e6,
+            "" if legacy is None else "{:.1f}x".format(legacy / new)))
+
+
+if __name__ == '__main__':
+    main()
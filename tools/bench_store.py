@@ -0,0 +1,64 @@
+# Times the Game's CowboyStore (games/saloon/cowboy_store.py): its batch queries against the same loop over the cowboys'
+# properties, and what keeping it up to date adds to merging a turn's delta. Its columns are NumPy arrays when it is installed.
+#   python3 -m tools.bench_store [--map-width N] [--map-height N] [--cowboys N,N] [--turns N] [--repeat N]
+import argparse
+from unittest import mock
+from games.saloon import game as saloon_game
+from tools.bench_timing import best, merge_turn, new_manager
+from tools.saloon_payloads import SaloonWorkload
+
+
+class _Unstored(object):
+    """ a CowboyStore that keeps nothing, to time merging without one """
+    def __init__(self, game):
+        pass
+
+    def apply(self, journal):
+        pass
+
+
+def merge_with_store(initial, turns, repeat, store):
+    """best seconds per turn delta, with the Game keeping store as its CowboyStore"""
+    with mock.patch.object(saloon_game, 'CowboyStore', store):
+        return merge_turn([initial], turns, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the Game's CowboyStore against looping over the cowboys.")
+    parser.add_argument('--map-width', type=int, default=44)
+    parser.add_argument('--map-height', type=int, default=24)
+    parser.add_argument('--cowboys', default='30,300', help='cowboy counts, separated by commas')
+    parser.add_argument('--turns', type=int, default=100, help='turn deltas to merge')
+    parser.add_argument('--repeat', type=int, default=200, help='runs of each query, the best is kept')
+    args = parser.parse_args()
+
+    print("{:<10}{:<24}{:>12}{:>12}{:>10}".format("cowboys", "batch query", "loop us", "store us", "speedup"))
+    for cowboys in [int(count) for count in args.cowboys.split(',')]:
+        workload = SaloonWorkload(map_width=args.map_width, map_height=args.map_height, cowboys=cowboys, bottles=4)
+        initial = workload.initial_delta()
+        turns = list(workload.deltas(args.turns))
+        manager = new_manager()
+        manager.apply_delta_state(initial)
+        for delta in turns:
+            manager.apply_delta_state(delta)
+        game = manager.game
+        store = game.cowboy_store
+        player = game.players[0]
+        piano = next(f.tile for f in game.furnishings if f.is_piano)
+
+        queries = [
+            ('ready of a player', lambda: [c for c in game.cowboys if c.owner is player and not c.is_dead and c.turns_busy == 0],
+                lambda: store.where(owner=player, is_dead=False, turns_busy=0)),
+            ('distances to a piano', lambda: [abs(c.tile.x - piano.x) + abs(c.tile.y - piano.y) for c in game.cowboys],
+                lambda: store.distances(piano))
+        ]
+        for name, loop, batch in queries:
+            slow, fast = best(loop, args.repeat), best(batch, args.repeat)
+            print("{:<10}{:<24}{:>12.1f}{:>12.1f}{:>9.1f}x".format(cowboys, name, slow * 1e6, fast * 1e6, slow / fast))
+
+        without, kept = merge_with_store(initial, turns, 3, _Unstored), merge_with_store(initial, turns, 3, saloon_game.CowboyStore)
+        print("{:<10}merging a turn's delta: {:.1f} us without the store, {:.1f} us keeping it up to date".format(cowboys, without * 1e6, kept * 1e6))
+
+
+if __name__ == '__main__':
+    main()
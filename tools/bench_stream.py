@@ -0,0 +1,68 @@
+# Measures merging the first delta of a large synthetic Saloon map straight from its json (GameManager.apply_delta_stream),
+# against decoding it whole and then merging it (apply_delta_state): the time each takes, and the peak memory each allocates
+#   python3 -m tools.bench_stream [--map-width N] [--map-height N] [--cowboys N] [--repeat N]
+import argparse
+import gc
+import time
+import tracemalloc
+import joueur.codec as codec
+from joueur.json_stream import JsonStream
+from tools.bench_merge import new_manager, state_of
+from tools.saloon_payloads import SaloonWorkload, event
+
+
+def decoded(frame, start):
+    manager = new_manager()
+    manager.apply_delta_state(codec.loads(frame)['data'])
+    return manager
+
+def streamed(frame, start):
+    manager = new_manager()
+    manager.apply_delta_stream(JsonStream(frame.decode("utf-8"), start))
+    return manager
+
+
+def measure(merge, frame, start, repeat):
+    """(best seconds, peak bytes allocated while merging, bytes still held by the merged game after) of merging the frame into a new game"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        merge(frame, start)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    manager = merge(frame, start)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, held, manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times and measures the peak memory of merging a large first delta streamed, against decoding it first.')
+    parser.add_argument('--map-width', type=int, default=88)
+    parser.add_argument('--map-height', type=int, default=48)
+    parser.add_argument('--cowboys', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each timing, the best is kept')
+    parser.add_argument('--codec', default='auto', help='the codec decoding the frame whole: orjson, ujson or json')
+    args = parser.parse_args()
+
+    codec.use(args.codec)
+    workload = SaloonWorkload(map_width=args.map_width, map_height=args.map_height, cowboys=args.cowboys, bottles=args.cowboys // 2)
+    frame = codec.dumps(event("delta", workload.initial_delta()))
+    start = frame.index(b'"data":') + len(b'"data":')
+
+    results = [(codec.name + " loads, then merge", measure(decoded, frame, start, args.repeat)), ("streamed merge", measure(streamed, frame, start, args.repeat))]
+    if state_of(results[0][1][3]) != state_of(results[1][1][3]):
+        raise SystemExit("the merges disagree")
+
+    print("first delta of a {}x{} map: {:.0f} KiB, {} game objects".format(args.map_width, args.map_height, len(frame) / 1024, len(results[0][1][3].game._game_objects)))
+    print("{:<28}{:>10}{:>14}{:>14}{:>18}".format("", "ms", "peak KiB", "held KiB", "peak - held KiB"))
+    for label, (seconds, peak, held, manager) in results:
+        print("{:<28}{:>10.1f}{:>14.0f}{:>14.0f}{:>18.0f}".format(label, seconds * 1000, peak / 1024, held / 1024, (peak - held) / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+# Benchmark suite over synthetic Saloon workloads, for comparing the client's hot paths across commits:
+#   merging deltas (GameManager.apply_delta_state), serialize/deserialize of order and run arguments,
+#   and the full client frame path (socket, frame split, json decode, delta merge) through a real Client.
+#   Every combination of the workload parameters given is run, and the results are written as json.
+#
+#   python3 -m tools.bench_suite --output before.json
+#   python3 -m tools.bench_suite --maps 44x24 --cowboys 6,30 --bottles 20 --logs 0,10 --output after.json --compare before.json
+import argparse
+import contextlib
+import itertools
+import json
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import joueur.codec as codec
+from joueur.client import Client, EOT_BYTE
+from joueur.serializer import serialize, deserialize
+from tools.bench_timing import merge_turn, new_manager, per_item
+from tools.saloon_payloads import SaloonWorkload, event
+
+
+def bench_merge(initial, turns, repeat):
+    return {
+        'merge.initial': merge_turn([], [initial], repeat),
+        'merge.turn': merge_turn([initial], turns, repeat)
+    }
+
+
+def bench_serializer(initial, repeat):
+    manager = new_manager()
+    manager.apply_delta_state(initial)
+    game = manager.game
+    run_args = [{'tile': cowboy.tile, 'drunkDirection': "North"} for cowboy in game.cowboys if cowboy.tile] # what the cowboys' commands send
+    references = serialize(list(game.tiles))
+    order_args = [[reference, 1, "x"] for reference in references] # what orders bring in
+
+    return {
+        'serialize.run_args': per_item(serialize, run_args, repeat),
+        'deserialize.order_args': per_item(lambda args: deserialize(args, game), order_args, repeat),
+        'deserialize.references': per_item(lambda args: deserialize(args, game), [references], repeat)
+    }
+
+
+class _FrameServer():
+    """the server's end of a socket to a Client, sending it frames from a thread so neither side's socket buffer fills up"""
+
+    def __init__(self):
+        self._listener = socket.create_server(('127.0.0.1', 0))
+        self.port = self._listener.getsockname()[1]
+        self._connection = None
+
+    def accept(self):
+        self._connection, _ = self._listener.accept()
+
+    def send(self, data):
+        thread = threading.Thread(target=self._connection.sendall, args=(data,), daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+        self._listener.close()
+
+
+def bench_frames(initial, turns, repeat):
+    frames = [codec.dumps(event('delta', delta)) + EOT_BYTE for delta in [initial] + turns]
+
+    def path(setup, timed):
+        def run():
+            server = _FrameServer()
+            accepting = threading.Thread(target=server.accept)
+            accepting.start()
+            client = Client(exit_process=False)
+            with contextlib.redirect_stdout(sys.stderr): # keeps stdout to the results
+                client.connect('127.0.0.1', server.port)
+            accepting.join()
+            manager = new_manager()
+            client.setup(manager.game, _NoAI(), manager)
+            try:
+                deliver(client, server, setup)
+                started = time.perf_counter()
+                deliver(client, server, timed)
+                return time.perf_counter() - started
+            finally:
+                client.disconnect()
+                server.close()
+        return min(run() for _ in range(repeat)) / len(timed) # run() times just the timed frames
+    return {
+        'frame.initial': path([], frames[:1]),
+        'frame.turn': path(frames[:1], frames[1:])
+    }
+
+
+class _NoAI():
+    player = None # so game_updated is never called, this times the client and not an AI
+
+
+def deliver(client, server, frames):
+    """sends the frames to the client, and has it read, decode and handle every one"""
+    if not frames:
+        return
+    sending = server.send(b"".join(frames))
+    handled = 0
+    while handled < len(frames):
+        client.wait_for_events()
+        while client._events_stack:
+            sent = client._events_stack.pop()
+            client._auto_handle(sent['event'], sent.get('data'))
+            handled += 1
+    sending.join()
+
+
+def _commit():
+    try:
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ints(text):
+    return [int(value) for value in text.split(',')]
+
+def _maps(text):
+    return [tuple(int(side) for side in size.split('x')) for size in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times delta merging, (de)serializing and the client frame path over synthetic Saloon workloads, as json.')
+    parser.add_argument('--maps', type=_maps, default=_maps('22x12,44x24'), help='map sizes, WIDTHxHEIGHT separated by commas')
+    parser.add_argument('--cowboys', type=_ints, default=[6, 30], help='cowboy counts, separated by commas')
+    parser.add_argument('--bottles', type=_ints, default=[4], help='bottles in flight, separated by commas')
+    parser.add_argument('--logs', type=_ints, default=[0], help='log messages added each turn, separated by commas')
+    parser.add_argument('--turns', type=int, default=100, help='turn deltas in each workload')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each measurement, the best is kept')
+    parser.add_argument('--codec', default='auto', help='the json codec the client frame path decodes with: orjson, ujson or json')
+    parser.add_argument('--output', default=None, help='write the results to this json file, else print them')
+    parser.add_argument('--compare', default=None, help='a previous --output to print each measurement against')
+    args = parser.parse_args()
+
+    codec.use(args.codec)
+    results = []
+    for (width, height), cowboys, bottles, logs in itertools.product(args.maps, args.cowboys, args.bottles, args.logs):
+        workload_args = {'map_width': width, 'map_height': height, 'cowboys': cowboys, 'bottles': bottles, 'log_volume': logs}
+        workload = SaloonWorkload(**workload_args)
+        initial = workload.initial_delta()
+        turns = list(workload.deltas(args.turns))
+
+        measured = {}
+        measured.update(bench_merge(initial, turns, args.repeat))
+        measured.update(bench_serializer(initial, args.repeat))
+        measured.update(bench_frames(initial, turns, args.repeat))
+        for name, seconds in measured.items():
+            results.append(dict(workload_args, name=name, us=seconds * 1e6))
+
+    report = {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'codec': codec.name,
+        'turns': args.turns,
+        'repeat': args.repeat,
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous = json.load(previous_file)
+        key = lambda result: tuple(result[name] for name in ('name', 'map_width', 'map_height', 'cowboys', 'bottles', 'log_volume'))
+        before = {key(result): result['us'] for result in previous['results']}
+        print("{:<24}{:>10}{:>8}{:>8}{:>6}{:>14}{:>14}{:>10}".format("measurement", "map", "cowboys", "bottles", "logs", str(previous['commit']) + " us", str(report['commit']) + " us", "speedup"))
+        for result in results:
+            old = before.get(key(result))
+            print("{:<24}{:>10}{:>8}{:>8}{:>6}{:>14}{:>14.2f}{:>10}".format(result['name'], "{}x{}".format(result['map_width'], result['map_height']),
+                result['cowboys'], result['bottles'], result['log_volume'], "" if old is None else "{:.2f}".format(old), result['us'],
+                "" if old is None else "{:.2f}x".format(old / result['us'])))
+
+
+if __name__ == '__main__':
+    main()
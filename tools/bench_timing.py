@@ -0,0 +1,49 @@
+# Timing helpers shared by the tools/bench_*.py scripts, so each one times things the same way
+import copy
+import time
+from joueur.run import load_game
+from tools.saloon_payloads import CONSTANTS
+
+
+def new_manager():
+    """a GameManager for a fresh Saloon game, with the constants the server would send when lobbied"""
+    game, ai, manager = load_game("Saloon")
+    manager.set_constants(CONSTANTS)
+    return manager
+
+
+def best(run, repeat):
+    """the least seconds a call of run() took, over `repeat` calls"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def per_item(function, items, repeat):
+    """best seconds per item to call function on each of the items, over `repeat` runs"""
+    def run():
+        for item in items:
+            function(item)
+    return best(run, repeat) / len(items)
+
+
+def merge_turn(setup, deltas, repeat, apply=None):
+    """best seconds per delta to merge the deltas, over `repeat` runs, each on a fresh game with the setup deltas merged and its own copy of the deltas
+
+    apply(manager, delta) merges a delta, GameManager.apply_delta_state by default
+    """
+    times = []
+    for _ in range(repeat):
+        manager = new_manager()
+        for delta in setup:
+            manager.apply_delta_state(delta)
+        copies = copy.deepcopy(deltas)
+        merge = manager.apply_delta_state if apply is None else lambda delta: apply(manager, delta)
+        started = time.perf_counter()
+        for delta in copies:
+            merge(delta)
+        times.append(time.perf_counter() - started)
+    return min(times) / len(deltas)
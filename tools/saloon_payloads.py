@@ -0,0 +1,225 @@
+# Synthetic Saloon games: the deltas and events a game server would send for them, for benchmarks and local test servers
+import random
+
+DELTA_LIST_LENGTH = "&LEN"
+DELTA_REMOVED = "&RM"
+
+CONSTANTS = {
+    'DELTA_LIST_LENGTH': DELTA_LIST_LENGTH,
+    'DELTA_REMOVED': DELTA_REMOVED
+}
+
+_offsets = {'North': (0, -1), 'East': (1, 0), 'South': (0, 1), 'West': (-1, 0)}
+_jobs = ['Bartender', 'Brawler', 'Sharpshooter']
+
+
+def _ref(obj):
+    return {'id': obj['id']} if obj is not None else None
+
+
+def _list_delta(items, start=0):
+    delta = {str(i): items[i] for i in range(start, len(items))}
+    delta[DELTA_LIST_LENGTH] = len(items)
+    return delta
+
+
+class SaloonWorkload():
+    """generates a full initial delta and a stream of turn deltas for a synthetic Saloon game"""
+
+    def __init__(self, map_width=22, map_height=12, cowboys=6, bottles=4, log_volume=0, pianos=6, tables=10, seed=0):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.log_volume = log_volume
+        self._random = random.Random(seed)
+        self._next_id = 0
+        self._objects = {}
+        self.turn = 0
+
+        self.players = [self._create("Player", name="Player " + str(i), clientType="Python") for i in range(2)]
+        self.players[0]['opponent'] = self.players[1]['id']
+        self.players[1]['opponent'] = self.players[0]['id']
+
+        self.tiles = []
+        for y in range(map_height):
+            for x in range(map_width):
+                self.tiles.append(self._create("Tile", x=x, y=y,
+                    isBalcony=(x == 0 or y == 0 or x == map_width - 1 or y == map_height - 1),
+                    hasHazard=False, cowboy=None, furnishing=None, bottle=None, youngGun=None))
+
+        open_tiles = [t for t in self.tiles if not t['isBalcony']]
+        self._random.shuffle(open_tiles)
+
+        self.furnishings = []
+        for i in range(pianos + tables):
+            tile = open_tiles.pop()
+            furnishing = self._create("Furnishing", tile=tile['id'], health=(8 if i < pianos else 4),
+                isPiano=(i < pianos), isPlaying=False, isDestroyed=False)
+            tile['furnishing'] = furnishing['id']
+            self.furnishings.append(furnishing)
+
+        for tile in open_tiles[:max(1, len(open_tiles) // 20)]:
+            tile['hasHazard'] = True
+
+        corners = [self._tile(0, 0), self._tile(map_width - 1, map_height - 1)]
+        self.young_guns = []
+        for player, tile in zip(self.players, corners):
+            young_gun = self._create("YoungGun", owner=player['id'], tile=tile['id'], canCallIn=True,
+                callInTile=self._call_in_tile(tile)['id'])
+            tile['youngGun'] = young_gun['id']
+            player['youngGun'] = young_gun['id']
+            self.young_guns.append(young_gun)
+
+        self.cowboys = []
+        for i in range(cowboys):
+            tile = open_tiles.pop()
+            owner = self.players[i % 2]
+            cowboy = self._create("Cowboy", owner=owner['id'], tile=tile['id'], job=_jobs[(i // 2) % len(_jobs)],
+                health=10, focus=0, tolerance=0, turnsBusy=0, canMove=True, isDead=False, isDrunk=False,
+                drunkDirection="")
+            tile['cowboy'] = cowboy['id']
+            self.cowboys.append(cowboy)
+
+        self.bottles = []
+        for i in range(bottles):
+            tile = open_tiles.pop()
+            bottle = self._create("Bottle", tile=tile['id'], direction=self._random.choice(list(_offsets)),
+                drunkDirection=self._random.choice(list(_offsets)), isDestroyed=False)
+            tile['bottle'] = bottle['id']
+            self.bottles.append(bottle)
+
+    def _create(self, game_object_name, **fields):
+        obj = {'id': str(self._next_id), 'gameObjectName': game_object_name, 'logs': []}
+        obj.update(fields)
+        self._objects[obj['id']] = obj
+        self._next_id += 1
+        return obj
+
+    def _tile(self, x, y):
+        if x < 0 or y < 0 or x >= self.map_width or y >= self.map_height:
+            return None
+        return self.tiles[x + y * self.map_width]
+
+    def _neighbor(self, tile, direction):
+        dx, dy = _offsets[direction]
+        return self._tile(tile['x'] + dx, tile['y'] + dy)
+
+    def _call_in_tile(self, tile):
+        for direction in _offsets:
+            neighbor = self._neighbor(tile, direction)
+            if neighbor and not neighbor['isBalcony']:
+                return neighbor
+        return self._neighbor(self._neighbor(tile, 'South') or self._neighbor(tile, 'North'), 'East' if tile['x'] == 0 else 'West')
+
+    def _serialize(self, obj):
+        """the full delta form of one game object, as sent in the first frame"""
+        delta = {}
+        for key, value in obj.items():
+            if key == 'logs':
+                delta[key] = _list_delta(value)
+            elif key in _reference_keys and value is not None:
+                delta[key] = {'id': value}
+            else:
+                delta[key] = value
+        if obj['gameObjectName'] == 'Tile':
+            for direction in _offsets:
+                neighbor = self._neighbor(obj, direction)
+                delta['tile' + direction] = _ref(neighbor)
+        elif obj['gameObjectName'] == 'Player':
+            delta['cowboys'] = _list_delta([{'id': c['id']} for c in self.cowboys if c['owner'] == obj['id']])
+            delta['timeRemaining'] = 1e10
+            delta.update(kills=0, lost=False, won=False, reasonLost="", reasonWon="", rowdiness=0, score=0, siesta=0)
+        return delta
+
+    def initial_delta(self):
+        """the first delta of a game, carrying every game object"""
+        return {
+            'bartenderCooldown': 5,
+            'brawlerDamage': 1,
+            'maxCowboysPerJob': 2,
+            'maxTurns': 300,
+            'rowdinessToSiesta': 8,
+            'sharpshooterDamage': 4,
+            'siestaLength': 8,
+            'turnsDrunk': 5,
+            'session': "synthetic",
+            'currentTurn': 0,
+            'currentPlayer': {'id': self.players[0]['id']},
+            'mapWidth': self.map_width,
+            'mapHeight': self.map_height,
+            'jobs': _list_delta(list(_jobs)),
+            'players': _list_delta([{'id': p['id']} for p in self.players]),
+            'tiles': _list_delta([{'id': t['id']} for t in self.tiles]),
+            'furnishings': _list_delta([{'id': f['id']} for f in self.furnishings]),
+            'cowboys': _list_delta([{'id': c['id']} for c in self.cowboys]),
+            'bottles': _list_delta([{'id': b['id']} for b in self.bottles]),
+            'gameObjects': {id: self._serialize(obj) for id, obj in self._objects.items()}
+        }
+
+    def _change(self, changes, obj, key, value):
+        obj[key] = value
+        changes.setdefault(obj['id'], {})[key] = {'id': value} if key in _reference_keys and value is not None else value
+
+    def _log(self, changes, obj, message):
+        obj['logs'].append(message)
+        changes.setdefault(obj['id'], {})['logs'] = _list_delta(obj['logs'], len(obj['logs']) - 1)
+
+    def next_delta(self):
+        """advances the synthetic game one turn and returns the delta the server would send for it"""
+        self.turn += 1
+        player = self.players[self.turn % 2]
+        changes = {}
+
+        for cowboy in self.cowboys:
+            if cowboy['owner'] != player['id']:
+                continue
+            tile = self._objects[cowboy['tile']]
+            direction = self._random.choice(list(_offsets))
+            target = self._neighbor(tile, direction)
+            if target and not target['isBalcony'] and not target['furnishing'] and not target['cowboy']:
+                self._change(changes, tile, 'cowboy', None)
+                self._change(changes, target, 'cowboy', cowboy['id'])
+                self._change(changes, cowboy, 'tile', target['id'])
+            self._change(changes, cowboy, 'turnsBusy', self._random.randint(0, 3))
+            self._change(changes, cowboy, 'canMove', True)
+
+        for bottle in self.bottles:
+            tile = self._objects[bottle['tile']]
+            target = self._neighbor(tile, bottle['direction'])
+            if not target or target['isBalcony'] or target['furnishing'] or target['cowboy'] or target['bottle']:
+                self._change(changes, bottle, 'direction', _opposite[bottle['direction']])
+                continue
+            self._change(changes, tile, 'bottle', None)
+            self._change(changes, target, 'bottle', bottle['id'])
+            self._change(changes, bottle, 'tile', target['id'])
+
+        for i in range(self.log_volume):
+            self._log(changes, self._random.choice(self.cowboys), "turn {} log {}".format(self.turn, i))
+
+        self._change(changes, player, 'timeRemaining', 1e10 - self.turn * 1e7)
+        self._change(changes, player, 'score', self.turn // 4)
+
+        return {
+            'currentTurn': self.turn,
+            'currentPlayer': {'id': player['id']},
+            'gameObjects': changes
+        }
+
+    def deltas(self, turns):
+        """yields the next `turns` deltas"""
+        for _ in range(turns):
+            yield self.next_delta()
+
+    def run_payload(self, function_name="move"):
+        """a 'run' event's data as the client sends it for a cowboy command"""
+        cowboy = self.cowboys[0]
+        args = {'tile': {'id': cowboy['tile']}} if function_name != "callIn" else {'job': "Brawler"}
+        return {'caller': {'id': cowboy['id']}, 'functionName': function_name, 'args': args}
+
+
+_reference_keys = {'owner', 'tile', 'cowboy', 'furnishing', 'bottle', 'youngGun', 'callInTile', 'opponent'}
+_opposite = {'North': 'South', 'South': 'North', 'East': 'West', 'West': 'East'}
+
+
+def event(event_name, data=None):
+    """the envelope every event is wrapped in"""
+    return {'event': event_name, 'epoch': 1500000000000, 'data': data}
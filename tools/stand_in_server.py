@@ -0,0 +1,234 @@
+# Stand-in game server: speaks the same protocol as the real game server closely enough to load test the client stack on one box.
+#   Every connection plays its own one player game, either a synthetic Saloon game or a recording made with the client's --record.
+#   Turn latency (order sent to finished received) and throughput are reported across all connections.
+#
+#   python3 -m tools.stand_in_server --port 3000 [--recording FILE] [--turns N] [--games N]
+#   ./run Saloon -s localhost:3000     (as many times, and as concurrently, as you like)
+import argparse
+import asyncio
+import time
+import joueur.codec as codec
+from joueur.recorder import read_recording
+from joueur.telemetry import Histogram
+from tools.saloon_payloads import SaloonWorkload, CONSTANTS, event
+
+EOT_BYTE = b"\x04"
+
+
+def _frame(sent):
+    """the (event name, raw frame) pair every game hands back to be sent"""
+    return sent['event'], codec.dumps(sent) + EOT_BYTE
+
+
+# SyntheticGame: a generated Saloon game that lasts a set number of turns, every command the AI sends works
+class SyntheticGame():
+    def __init__(self, session, turns, **workload_options):
+        self.session = session
+        self.turns = turns
+        self._workload = SaloonWorkload(seed=session, **workload_options)
+        self._order_index = 0
+
+    def on_alias(self):
+        return [_frame(event('named', "Saloon"))]
+
+    def on_play(self):
+        return [
+            _frame(event('lobbied', {'gameName': "Saloon", 'gameSession': str(self.session), 'constants': CONSTANTS})),
+            _frame(event('delta', self._workload.initial_delta())),
+            _frame(event('start', {'playerID': self._workload.players[0]['id']})),
+            self._order()
+        ]
+
+    def on_run(self, data):
+        return [_frame(event('ran', None if data['functionName'] == "callIn" else True))]
+
+    def on_finished(self):
+        frames = [_frame(event('delta', self._workload.next_delta())), _frame(event('delta', self._workload.next_delta()))] # ours, then the opponent's turn
+        if self._order_index < self.turns:
+            frames.append(self._order())
+        else:
+            players = self._workload.players
+            frames.append(_frame(event('delta', {'gameObjects': {
+                players[0]['id']: {'won': True, 'reasonWon': "Outlasted the stand-in server"},
+                players[1]['id']: {'lost': True, 'reasonLost': "Was only a stand-in"}
+            }})))
+            frames.append(_frame(event('over', {'message': "Stand-in game {} is over.".format(self.session)})))
+        return frames
+
+    def _order(self):
+        frame = _frame(event('order', {'name': "runTurn", 'index': self._order_index, 'args': []}))
+        self._order_index += 1
+        return frame
+
+
+# RecordedGame: serves the frames of a recording back in order, pausing at each order and answering runs with the recorded "ran" events
+class RecordedGame():
+    def __init__(self, session, recording):
+        self.session = session
+        self._recording = recording # (event name, raw frame) pairs
+        self._cursor = 0
+
+    def _until(self, stop_events, include_stop=True, skip=()):
+        frames = []
+        while self._cursor < len(self._recording):
+            recorded = self._recording[self._cursor]
+            if recorded[0] in stop_events:
+                if include_stop:
+                    frames.append(recorded)
+                    self._cursor += 1
+                return frames, True
+            if recorded[0] not in skip:
+                frames.append(recorded)
+            self._cursor += 1
+        return frames, False
+
+    def on_alias(self):
+        frames, found = self._until(('named',))
+        return frames
+
+    def on_play(self):
+        frames, found = self._until(('order', 'over'))
+        return frames
+
+    def on_run(self, data):
+        if self._cursor < len(self._recording) and self._recording[self._cursor][0] in ('order', 'over'):
+            return [_frame(event('ran', None))] # the client sent more commands than were recorded
+
+        frames, found = self._until(('ran', 'order', 'over'), include_stop=False)
+        if found and self._recording[self._cursor][0] == 'ran':
+            frames.append(self._recording[self._cursor])
+            self._cursor += 1
+        else:
+            frames.append(_frame(event('ran', None)))
+        return frames
+
+    def on_finished(self):
+        frames, found = self._until(('order', 'over'), skip=('ran',)) # results of commands this client never sent
+        return frames
+
+
+def load_recording(path):
+    recording = []
+    for timestamp, frame in read_recording(path):
+        recording.append((codec.loads(frame)['event'], bytes(frame) + EOT_BYTE))
+    return recording
+
+
+# StandInServer: accepts any number of clients, giving each its own game, and keeps stats across all of them
+class StandInServer():
+    def __init__(self, make_game, max_games=None):
+        self._make_game = make_game
+        self._max_games = max_games
+        self._next_session = 0
+        self.connections = 0
+        self.games_over = 0
+        self.turns = 0
+        self.turn_latency = Histogram()
+        self.started = time.perf_counter()
+        self.done = asyncio.Event()
+
+    async def handle(self, reader, writer):
+        game = self._make_game(self._next_session)
+        self._next_session += 1
+        self.connections += 1
+        order_sent_at = None
+
+        try:
+            while True:
+                try:
+                    frame = await reader.readuntil(EOT_BYTE)
+                except asyncio.IncompleteReadError:
+                    break # client went away
+
+                sent = codec.loads(frame[:-1])
+                name = sent['event']
+                if name == 'alias':
+                    frames = game.on_alias()
+                elif name == 'play':
+                    frames = game.on_play()
+                elif name == 'run':
+                    frames = game.on_run(sent['data'])
+                elif name == 'finished':
+                    if order_sent_at is not None:
+                        self.turn_latency.record(time.perf_counter() - order_sent_at)
+                        self.turns += 1
+                        order_sent_at = None
+                    frames = game.on_finished()
+                else:
+                    frames = [_frame(event('fatal', {'message': "The stand-in server does not know the event '{}'.".format(name)}))]
+
+                writer.write(b"".join(raw for sent_event, raw in frames))
+                await writer.drain()
+
+                last_event = frames[-1][0] if frames else None
+                if last_event == 'order':
+                    order_sent_at = time.perf_counter()
+                elif last_event == 'over':
+                    self.games_over += 1
+                    break
+        finally:
+            self.connections -= 1
+            writer.close()
+            if self._max_games and self.games_over >= self._max_games:
+                self.done.set()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        h = self.turn_latency
+        return "{} games over, {} connected, {} turns in {:.1f}s ({:.1f} turns/s), turn latency mean {:.3f}ms p50 {:.3f}ms p99 {:.3f}ms max {:.3f}ms".format(
+            self.games_over, self.connections, self.turns, elapsed, self.turns / elapsed if elapsed else 0.0,
+            h.mean * 1000, h.percentile(50) * 1000, h.percentile(99) * 1000, (h.max or 0) * 1000)
+
+
+async def serve(args):
+    if args.recording:
+        recording = load_recording(args.recording)
+        def make_game(session):
+            return RecordedGame(session, recording)
+    else:
+        def make_game(session):
+            return SyntheticGame(session, args.turns, map_width=args.map_width, map_height=args.map_height,
+                cowboys=args.cowboys, bottles=args.bottles, log_volume=args.logs)
+
+    stand_in = StandInServer(make_game, args.games)
+    server = await asyncio.start_server(stand_in.handle, args.host, args.port, backlog=args.backlog, limit=1 << 26)
+    print("Stand-in server listening on {}:{}".format(args.host, args.port))
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.report_interval)
+            print(stand_in.report())
+
+    reporter = asyncio.ensure_future(report())
+    try:
+        async with server:
+            await stand_in.done.wait()
+    finally:
+        reporter.cancel()
+        print(stand_in.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs a local stand-in for the game server, giving every client that connects its own game.')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--backlog', type=int, default=1024, help='pending connections to queue, raise it when connecting many clients at once')
+    parser.add_argument('--recording', default=None, help='serve this --record file to every client instead of a synthetic game')
+    parser.add_argument('--turns', type=int, default=100, help='orders in each synthetic game')
+    parser.add_argument('--map-width', type=int, default=22)
+    parser.add_argument('--map-height', type=int, default=12)
+    parser.add_argument('--cowboys', type=int, default=0, help='cowboys already in the synthetic game when it starts')
+    parser.add_argument('--bottles', type=int, default=4)
+    parser.add_argument('--logs', type=int, default=0, help='log messages added to the synthetic game each turn')
+    parser.add_argument('--games', type=int, default=None, help='exit once this many games are over')
+    parser.add_argument('--report-interval', type=float, default=5.0, help='seconds between stats reports')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()